@@ -8,12 +8,16 @@ from alembic import context
 config = context.config
 
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    # Migrations also run from the app lifespan; keep its loggers alive.
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
-from db.db import Base
+from db.db import Base, SQLALCHEMY_DATABASE_URL
 from db import models
 target_metadata = Base.metadata
 
+# The app's engine is the source of truth for where the database lives.
+config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL)
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
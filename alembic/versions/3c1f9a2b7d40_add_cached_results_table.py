@@ -0,0 +1,40 @@
+"""Add cached_results table for the persistent result cache
+
+Revision ID: 3c1f9a2b7d40
+Revises: 7eecae6a0ba8
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a2b7d40'
+down_revision: Union[str, None] = '7eecae6a0ba8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cached_results',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('site', sa.String(), nullable=True),
+    sa.Column('endpoint', sa.String(), nullable=True),
+    sa.Column('query', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('storedAt', sa.DateTime(), nullable=True),
+    sa.Column('expiresAt', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_cached_results_expiresAt'), 'cached_results', ['expiresAt'], unique=False)
+    op.create_index(op.f('ix_cached_results_site'), 'cached_results', ['site'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cached_results_site'), table_name='cached_results')
+    op.drop_index(op.f('ix_cached_results_expiresAt'), table_name='cached_results')
+    op.drop_table('cached_results')
@@ -0,0 +1,80 @@
+import importlib
+import os
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Large enough that every listing fixture is parsed in full.
+BENCH_LIMIT = 1000
+
+
+class Case:
+    """
+    One benchmarked parse: a fixture page of `site` fed to a scraper method.
+    `page` is "listing" (the `_parser` of a search page) or "detail" (the
+    per-torrent scrape that enriches one row).
+    """
+
+    def __init__(self, site, page, module, cls, method="_parser", args=()):
+        self.site = site
+        self.page = page
+        self.module = module
+        self.cls = cls
+        self.method = method
+        self.args = args
+
+    @property
+    def name(self):
+        return "{}/{}".format(self.site, self.page)
+
+    @property
+    def fixture(self):
+        return os.path.join(FIXTURES, self.site, self.page + ".html")
+
+    def load(self):
+        with open(self.fixture, "rb") as f:
+            return f.read()
+
+    def scraper(self):
+        module = importlib.import_module("torrents." + self.module)
+        instance = getattr(module, self.cls)()
+        instance.LIMIT = BENCH_LIMIT
+        return module, instance
+
+
+def _listing(site, module, cls, *args):
+    return Case(site, "listing", module, cls, args=args)
+
+
+def _detail(site, module, cls, method="_individual_scrap"):
+    return Case(site, "detail", module, cls, method=method)
+
+
+# Same order as all_sites in helper/is_site_available.py; the idx values
+# match what each scraper's search() passes to its parser.
+CASES = [
+    _listing("1337x", "x1337", "x1337"),
+    _detail("1337x", "x1337", "x1337"),
+    _listing("torlock", "torlock", "Torlock", 5),
+    _detail("torlock", "torlock", "Torlock"),
+    _listing("zooqle", "zooqle", "Zooqle"),
+    _listing("magnetdl", "magnet_dl", "Magnetdl"),
+    _listing("tgx", "torrent_galaxy", "TorrentGalaxy"),
+    _detail("tgx", "torrent_galaxy", "TorrentGalaxy", "_parser_individual"),
+    _listing("nyaasi", "nyaa_si", "NyaaSi"),
+    _listing("piratebay", "pirate_bay", "PirateBay"),
+    _listing("bitsearch", "bitsearch", "Bitsearch"),
+    _listing("kickass", "kickass", "Kickass"),
+    _detail("kickass", "kickass", "Kickass"),
+    _listing("libgen", "libgen", "Libgen"),
+    _detail("libgen", "libgen", "Libgen"),
+    _listing("yts", "yts", "Yts"),
+    _detail("yts", "yts", "Yts"),
+    _listing("limetorrent", "limetorrents", "Limetorrent", 5),
+    _detail("limetorrent", "limetorrents", "Limetorrent"),
+    _listing("torrentfunk", "torrentfunk", "TorrentFunk", 6),
+    _detail("torrentfunk", "torrentfunk", "TorrentFunk"),
+    _listing("glodls", "glodls", "Glodls"),
+    _listing("torrentproject", "torrentProject", "TorrentProject"),
+    _detail("torrentproject", "torrentProject", "TorrentProject"),
+    _listing("ybt", "your_bittorrent", "YourBittorrent", 6),
+    _detail("ybt", "your_bittorrent", "YourBittorrent"),
+]
@@ -0,0 +1,222 @@
+"""
+Offline parser benchmark over the checked-in fixtures.
+
+    python -m benchmarks.parsers                     # all sites, both backends
+    python -m benchmarks.parsers --site 1337x --backend lxml
+    python -m benchmarks.parsers --save base.json    # on the base commit
+    python -m benchmarks.parsers --compare base.json # on the candidate
+
+For every case and backend it reports parsed rows, median time per parse,
+rows/sec, the tracemalloc peak of one parse and the number of memory blocks
+held by the tree(s) the parse builds.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from helper import html_scraper, parser
+from .cases import CASES
+
+BACKENDS = ["lxml", "html.parser"]
+
+
+def _rows(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    if not result or not result.get("data"):
+        return 0
+    return len(result["data"])
+
+
+def _make_call(case, loop):
+    """
+    Returns a zero-argument callable doing one parse of the case's fixture
+    and returning the number of rows it produced.
+    """
+    _, instance = case.scraper()
+    html = case.load()
+    method = getattr(instance, case.method)
+    if case.method == "_individual_scrap":
+
+        def call():
+            obj = {}
+            loop.run_until_complete(method(None, case.fixture, obj))
+            return 1 if obj else 0
+
+    else:
+
+        def call():
+            return _rows(method([html], *case.args))
+
+    return call
+
+
+@contextmanager
+def _offline_detail_fetch(case):
+    """
+    Detail scrapers fetch their own page; hand them the fixture instead.
+    """
+    html = case.load()
+    original = html_scraper.Scraper._get_html
+
+    async def _get_html(self, session, url, *args, **kwargs):
+        return html
+
+    html_scraper.Scraper._get_html = _get_html
+    try:
+        yield
+    finally:
+        html_scraper.Scraper._get_html = original
+
+
+@contextmanager
+def _count_tree_blocks(case, counter):
+    """
+    Wraps the make_soup the case's module imported so every tree it builds
+    adds its block count to `counter`.
+    """
+    module, _ = case.scraper()
+    original = module.make_soup
+
+    def make_soup(markup, parse_only=None):
+        before = sys.getallocatedblocks()
+        soup = original(markup, parse_only=parse_only)
+        counter[0] += sys.getallocatedblocks() - before
+        return soup
+
+    module.make_soup = make_soup
+    try:
+        yield
+    finally:
+        module.make_soup = original
+
+
+def measure(case, backend, repeat, loop):
+    parser.set_backend(backend)
+    with _offline_detail_fetch(case):
+        call = _make_call(case, loop)
+        rows = call()  # warm-up, also imports lazily loaded bits
+        if rows == 0:
+            raise RuntimeError("{} produced no rows".format(case.name))
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - start)
+
+        gc.collect()
+        gc.disable()
+        try:
+            blocks = [0]
+            with _count_tree_blocks(case, blocks):
+                call()
+            tracemalloc.start()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            gc.enable()
+    seconds = statistics.median(timings)
+    return {
+        "rows": rows,
+        "ms": seconds * 1000,
+        "rows_per_sec": rows / seconds,
+        "peak_kib": peak / 1024,
+        "allocs": blocks[0],
+    }
+
+
+def run(cases, backends, repeat):
+    loop = asyncio.new_event_loop()
+    results = {}
+    try:
+        for case in cases:
+            for backend in backends:
+                key = "{}/{}".format(case.name, backend)
+                results[key] = measure(case, backend, repeat, loop)
+    finally:
+        loop.close()
+    return results
+
+
+HEADER = "{:<24} {:<12} {:>5} {:>10} {:>10} {:>10} {:>9}".format(
+    "case", "backend", "rows", "ms/parse", "rows/s", "peak KiB", "allocs"
+)
+
+
+def _row(key, r):
+    site, page, backend = key.split("/")
+    return "{:<24} {:<12} {:>5} {:>10.3f} {:>10.0f} {:>10.1f} {:>9}".format(
+        site + "/" + page, backend, r["rows"], r["ms"], r["rows_per_sec"],
+        r["peak_kib"], r["allocs"],
+    )
+
+
+def report(results):
+    lines = [HEADER, "-" * len(HEADER)]
+    lines += [_row(key, results[key]) for key in results]
+    return "\n".join(lines)
+
+
+def _delta(base, head):
+    if not base:
+        return "    n/a"
+    return "{:>+7.1f}%".format((head - base) / base * 100)
+
+
+def compare(base, head):
+    header = "{:<24} {:<12} {:>10} {:>10} {:>8} {:>10} {:>8} {:>9} {:>8}".format(
+        "case", "backend", "base ms", "head ms", "time", "peak KiB", "peak",
+        "allocs", "allocs",
+    )
+    lines = [header, "-" * len(header)]
+    for key, h in head.items():
+        b = base.get(key)
+        site, page, backend = key.split("/")
+        if b is None:
+            lines.append("{:<24} {:<12} (new)".format(site + "/" + page, backend))
+            continue
+        lines.append(
+            "{:<24} {:<12} {:>10.3f} {:>10.3f} {:>8} {:>10.1f} {:>8} {:>9} {:>8}".format(
+                site + "/" + page, backend, b["ms"], h["ms"], _delta(b["ms"], h["ms"]),
+                h["peak_kib"], _delta(b["peak_kib"], h["peak_kib"]),
+                h["allocs"], _delta(b["allocs"], h["allocs"]),
+            )
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--site", action="append", help="only these sites")
+    ap.add_argument("--page", choices=["listing", "detail"])
+    ap.add_argument("--backend", action="append", choices=BACKENDS)
+    ap.add_argument("--repeat", type=int, default=20, help="timed parses per case")
+    ap.add_argument("--save", help="write the raw results as JSON")
+    ap.add_argument("--compare", help="JSON saved by an earlier --save run")
+    args = ap.parse_args(argv)
+
+    cases = [
+        c for c in CASES
+        if (not args.site or c.site in args.site)
+        and (not args.page or c.page == args.page)
+    ]
+    results = run(cases, args.backend or BACKENDS, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), results))
+    else:
+        print(report(results))
+
+
+if __name__ == "__main__":
+    main()
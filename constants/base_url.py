@@ -1,16 +1,31 @@
-X1337 = "https://1337x.to"
-TGX = "https://torrentgalaxy.to"
-TORLOCK = "https://www.torlock.com"
-PIRATEBAY = "https://thepiratebay10.org"
-NYAASI = "https://nyaa.si"
-ZOOQLE = "https://zooqle.com"
-KICKASS = "https://kickasstorrents.to"
-BITSEARCH = "https://bitsearch.to"
-MAGNETDL = "https://www.magnetdl.com"
-LIBGEN = "https://libgen.is"
-YTS = "https://yts.mx"
-LIMETORRENT = "https://www.limetorrents.pro"
-TORRENTFUNK = "https://www.torrentfunk.com"
-GLODLS = "https://glodls.to"
-TORRENTPROJECT = "https://torrentproject2.com"
-YOURBITTORRENT = "https://yourbittorrent.com"
+import os
+from urllib.parse import urlsplit
+
+# Points every site at a local stand-in such as loadtest/replay_server.py.
+# With UPSTREAM_BASE_URL=http://127.0.0.1:8090, 1337x is fetched from
+# http://127.0.0.1:8090/1337x.to/... instead of https://1337x.to/...
+UPSTREAM_BASE_URL = os.environ.get("UPSTREAM_BASE_URL", "").rstrip("/")
+
+
+def _upstream(url):
+    if not UPSTREAM_BASE_URL:
+        return url
+    return "{}/{}".format(UPSTREAM_BASE_URL, urlsplit(url).netloc)
+
+
+X1337 = _upstream("https://1337x.to")
+TGX = _upstream("https://torrentgalaxy.to")
+TORLOCK = _upstream("https://www.torlock.com")
+PIRATEBAY = _upstream("https://thepiratebay10.org")
+NYAASI = _upstream("https://nyaa.si")
+ZOOQLE = _upstream("https://zooqle.com")
+KICKASS = _upstream("https://kickasstorrents.to")
+BITSEARCH = _upstream("https://bitsearch.to")
+MAGNETDL = _upstream("https://www.magnetdl.com")
+LIBGEN = _upstream("https://libgen.is")
+YTS = _upstream("https://yts.mx")
+LIMETORRENT = _upstream("https://www.limetorrents.pro")
+TORRENTFUNK = _upstream("https://www.torrentfunk.com")
+GLODLS = _upstream("https://glodls.to")
+TORRENTPROJECT = _upstream("https://torrentproject2.com")
+YOURBITTORRENT = _upstream("https://yourbittorrent.com")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
 from sqlalchemy.orm import relationship
 from .db import Base
 
@@ -15,3 +15,16 @@ class Item(Base):
     tmdbId = Column(String, index=True, nullable=True)
     season = Column(Integer, index=True, nullable=True)
     episode = Column(Integer, index=True, nullable=True)
+
+
+class CachedResult(Base):
+    __tablename__ = "cached_results"
+
+    key = Column(String, primary_key=True)
+    site = Column(String, index=True)
+    endpoint = Column(String)
+    query = Column(String, nullable=True)
+    category = Column(String, nullable=True)
+    payload = Column(Text)
+    storedAt = Column(DateTime)
+    expiresAt = Column(DateTime, index=True)
@@ -0,0 +1,362 @@
+import contextvars
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from opentelemetry.metrics import get_meter, Observation
+
+# Seconds a successful result is served from memory, per kind of call.
+# 0 turns caching off for that kind.
+CACHE_TTL_SEARCH = float(os.environ.get("CACHE_TTL_SEARCH", 300))
+CACHE_TTL_TRENDING = float(os.environ.get("CACHE_TTL_TRENDING", 600))
+CACHE_TTL_RECENT = float(os.environ.get("CACHE_TTL_RECENT", 300))
+# Seconds past its TTL a result may still be served while a background
+# refresh replaces it; after that, callers wait for a live scrape.
+CACHE_STALE_TTL_SEARCH = float(os.environ.get("CACHE_STALE_TTL_SEARCH", 0))
+CACHE_STALE_TTL_TRENDING = float(os.environ.get("CACHE_STALE_TTL_TRENDING", 3600))
+CACHE_STALE_TTL_RECENT = float(os.environ.get("CACHE_STALE_TTL_RECENT", 900))
+# Upper bound on the serialized size of everything held, in bytes.
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Seconds a call that came back empty or blocked is answered the same way
+# without scraping again, and how many such calls are remembered.
+CACHE_TTL_EMPTY = float(os.environ.get("CACHE_TTL_EMPTY", 60))
+CACHE_TTL_BLOCKED = float(os.environ.get("CACHE_TTL_BLOCKED", 30))
+CACHE_NEGATIVE_MAX = int(os.environ.get("CACHE_NEGATIVE_MAX", 10000))
+
+# Scraper method -> (kind, names of its positional arguments).
+_METHODS = {
+    "search": ("search", ("query", "page", "limit")),
+    "search_by_category": ("search", ("query", "category", "page", "limit")),
+    "trending": ("trending", ("category", "page", "limit")),
+    "recent": ("recent", ("category", "page", "limit")),
+}
+
+# X-Cache values: served within its TTL, served past it while a refresh
+# runs, or scraped live for this request.
+FRESH = "fresh"
+STALE = "stale"
+REVALIDATED = "revalidated"
+
+_states = contextvars.ContextVar("cache_states", default=None)
+
+
+def cache_key(site, method, args, lazy=False):
+    """
+    Canonical (site, endpoint, query, category, page, limit, lazy) tuple for
+    a run_site call. `lazy` marks results fetched without detail pages.
+    None for methods that aren't cached.
+    """
+    if method not in _METHODS:
+        return None
+    values = dict(zip(_METHODS[method][1], args))
+    query = values.get("query")
+    category = values.get("category")
+    return (
+        site,
+        method,
+        query.lower() if query else None,
+        category.lower() if category else None,
+        values.get("page"),
+        values.get("limit"),
+        lazy,
+    )
+
+
+def encode(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def kind_of(key):
+    return _METHODS[key[1]][0]
+
+
+@contextmanager
+def cache_states():
+    """
+    Collects how every cached call made inside the block was answered,
+    including calls made by tasks it spawns.
+    """
+    states = []
+    token = _states.set(states)
+    try:
+        yield states
+    finally:
+        _states.reset(token)
+
+
+def report(state):
+    states = _states.get()
+    if states is not None:
+        states.append(state)
+
+
+def x_cache(states):
+    """
+    One X-Cache value for a response built from several calls: stale if
+    any part was, fresh if every part was, else revalidated.
+    """
+    if STALE in states:
+        return STALE
+    if states and all(state == FRESH for state in states):
+        return FRESH
+    return REVALIDATED
+
+
+class _Entry:
+    __slots__ = ("value", "size", "kind", "fresh_until", "expires_at")
+
+    def __init__(self, value, size, kind, fresh_until, expires_at):
+        self.value = value
+        self.size = size
+        self.kind = kind
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """
+    LRU of scraper results with a per-kind TTL, bounded by the total
+    serialized size of its entries rather than their number. Entries are
+    kept for their kind's stale TTL after they stop being fresh.
+    """
+
+    def __init__(self, max_bytes=None, ttls=None, stale_ttls=None):
+        self.max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttls = ttls or {
+            "search": CACHE_TTL_SEARCH,
+            "trending": CACHE_TTL_TRENDING,
+            "recent": CACHE_TTL_RECENT,
+        }
+        self.stale_ttls = stale_ttls or {
+            "search": CACHE_STALE_TTL_SEARCH,
+            "trending": CACHE_STALE_TTL_TRENDING,
+            "recent": CACHE_STALE_TTL_RECENT,
+        }
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _drop(self, key, reason):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        self.evictions += 1
+        eviction_counter.add(1, {"kind": entry.kind, "reason": reason})
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._drop(key, "expired")
+            entry = None
+        return entry
+
+    def get(self, *keys):
+        """
+        (value, fresh) for the first of `keys` with a fresh entry, else the
+        first with a stale one; the value is a copy safe to modify at the
+        top level. None on a miss.
+        """
+        kind = kind_of(keys[0])
+        now = time.monotonic()
+        hit = None
+        for key in keys:
+            entry = self._live(key)
+            if entry is None:
+                continue
+            if entry.fresh_until > now:
+                hit = (key, entry)
+                break
+            if hit is None:
+                hit = (key, entry)
+        if hit is not None:
+            key, entry = hit
+            self._entries.move_to_end(key)
+            self.hits += 1
+            fresh = entry.fresh_until > now
+            lookup_counter.add(
+                1, {"kind": kind, "result": "hit" if fresh else "stale"}
+            )
+            return dict(entry.value, data=list(entry.value["data"])), fresh
+        self.misses += 1
+        lookup_counter.add(1, {"kind": kind, "result": "miss"})
+        return None
+
+    def fresh_for(self, key):
+        """
+        Seconds `key` stays fresh, 0 once stale, None if not cached. Unlike
+        get() it doesn't count as a lookup.
+        """
+        entry = self._live(key)
+        if entry is None:
+            return None
+        return max(0.0, entry.fresh_until - time.monotonic())
+
+    def ttl_for(self, key):
+        return self.ttls.get(kind_of(key), 0)
+
+    def stale_ttl_for(self, key):
+        if self.ttl_for(key) <= 0:
+            return 0
+        return self.stale_ttls.get(kind_of(key), 0)
+
+    def put(self, key, value, ttl=None, stale_ttl=None, size=None):
+        """
+        Caches `value` as fresh for `ttl` seconds and stale for `stale_ttl`
+        more, by default its kind's TTLs. A negative `ttl` stores a value
+        that is already stale. `size` saves serializing a value whose
+        encoded length is already known.
+        """
+        kind = kind_of(key)
+        if ttl is None:
+            ttl = self.ttl_for(key)
+        if stale_ttl is None:
+            stale_ttl = self.stale_ttl_for(key)
+        if ttl + stale_ttl <= 0:
+            return
+        if size is None:
+            size = len(encode(value))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key).size
+        now = time.monotonic()
+        self._entries[key] = _Entry(
+            dict(value, data=list(value["data"])),
+            size,
+            kind,
+            now + ttl,
+            now + ttl + stale_ttl,
+        )
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)), "size")
+
+    def clear(self, site=None):
+        """
+        Drops every entry, or only those of `site`. Returns how many went.
+        """
+        keys = [k for k in self._entries if site is None or k[0] == site]
+        for key in keys:
+            self.bytes -= self._entries.pop(key).size
+        return len(keys)
+
+    def snapshot(self):
+        now = time.monotonic()
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "ttl": self.ttls,
+            "stale_ttl": self.stale_ttls,
+            "keys": [
+                {
+                    "site": key[0],
+                    "endpoint": key[1],
+                    "query": key[2],
+                    "category": key[3],
+                    "page": key[4],
+                    "limit": key[5],
+                    "lazy": key[6],
+                    "bytes": entry.size,
+                    "fresh": entry.fresh_until > now,
+                    "expires_in": max(0.0, entry.expires_at - now),
+                }
+                for key, entry in self._entries.items()
+            ],
+        }
+
+
+class NegativeCache:
+    """
+    Calls that came back empty or blocked, by the same keys as the result
+    cache, each remembered for its status's TTL. Holds at most `max_entries`,
+    dropping the oldest first.
+    """
+
+    def __init__(self, max_entries=None, ttls=None):
+        self.max_entries = CACHE_NEGATIVE_MAX if max_entries is None else max_entries
+        self.ttls = ttls or {"empty": CACHE_TTL_EMPTY, "blocked": CACHE_TTL_BLOCKED}
+        self._entries = OrderedDict()
+
+    def get(self, *keys):
+        """
+        (status, response) for the first of `keys` recorded and unexpired,
+        the response a copy safe to modify at the top level; None otherwise.
+        """
+        now = time.monotonic()
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            site_state, value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                continue
+            lookup_counter.add(1, {"kind": kind_of(key), "result": "negative"})
+            return site_state, None if value is None else dict(value, data=[])
+        return None
+
+    def put(self, key, site_state, value):
+        ttl = self.ttls.get(site_state, 0)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (
+            site_state,
+            None if value is None else dict(value, data=[]),
+            time.monotonic() + ttl,
+        )
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self, site=None):
+        keys = [k for k in self._entries if site is None or k[0] == site]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def snapshot(self):
+        return {"entries": len(self._entries), "ttl": self.ttls}
+
+
+meter = get_meter(__name__)
+lookup_counter = meter.create_counter(
+    "result_cache_lookups",
+    description="Result cache lookups by kind and hit/stale/miss/negative",
+)
+eviction_counter = meter.create_counter(
+    "result_cache_evictions",
+    description="Result cache entries dropped for size or expiry",
+)
+
+result_cache = ResultCache()
+negative_cache = NegativeCache()
+
+
+def _observe_bytes(options):
+    yield Observation(result_cache.bytes)
+
+
+def _observe_entries(options):
+    yield Observation(len(result_cache._entries))
+
+
+meter.create_observable_gauge(
+    "result_cache_bytes",
+    callbacks=[_observe_bytes],
+    unit="By",
+    description="Serialized size of everything in the result cache",
+)
+meter.create_observable_gauge(
+    "result_cache_entries",
+    callbacks=[_observe_entries],
+    description="Number of entries in the result cache",
+)
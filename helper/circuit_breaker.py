@@ -0,0 +1,99 @@
+import os
+import time
+from opentelemetry.metrics import get_meter, Observation
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Consecutive failures (blocked responses or timeouts) before a site trips.
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 5))
+# Seconds an open circuit waits before letting a single probe through.
+CIRCUIT_RESET_TIMEOUT = float(os.environ.get("CIRCUIT_RESET_TIMEOUT", 30))
+# Whether an empty result counts as a failure (a silently broken site).
+CIRCUIT_TRIP_ON_EMPTY = os.environ.get("CIRCUIT_TRIP_ON_EMPTY", "0") == "1"
+# Sites still running when a budget of at least this many ms runs out count
+# as failed; shorter budgets are the caller's choice and don't count.
+CIRCUIT_TIMEOUT_FLOOR_MS = int(os.environ.get("CIRCUIT_TIMEOUT_FLOOR_MS", 10000))
+
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=None, reset_timeout=None):
+        self.threshold = threshold or CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or CIRCUIT_RESET_TIMEOUT
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self):
+        """
+        Whether a request may go out now. In half-open state only one probe
+        is allowed until its outcome is recorded.
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+    def release(self):
+        """
+        Gives back a half-open probe slot whose request never completed.
+        """
+        self.probing = False
+
+    def snapshot(self):
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = max(
+                0.0, self.reset_timeout - (time.monotonic() - self.opened_at)
+            )
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": retry_in,
+        }
+
+
+breakers = {}
+
+
+def get_breaker(site):
+    breaker = breakers.get(site)
+    if breaker is None:
+        breaker = breakers[site] = CircuitBreaker()
+    return breaker
+
+
+def _observe_states(options):
+    for site, breaker in breakers.items():
+        yield Observation(_STATE_VALUE[breaker.state], {"site": site})
+
+
+meter = get_meter(__name__)
+meter.create_observable_gauge(
+    "site_circuit_state",
+    callbacks=[_observe_states],
+    description="Circuit breaker state per site (0 closed, 1 half-open, 2 open)",
+)
@@ -0,0 +1,70 @@
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Absolute monotonic deadline for the current request, inherited by every
+# task spawned while it is set.
+_deadline = contextvars.ContextVar("upstream_deadline", default=None)
+# The timeout_ms that set it.
+_budget_ms = contextvars.ContextVar("upstream_budget_ms", default=None)
+
+
+@contextmanager
+def deadline_scope(timeout_ms):
+    """
+    Sets a request budget of `timeout_ms`. Nested scopes can only tighten
+    the budget, never extend it. A falsy value leaves the current one as is.
+    """
+    current = _deadline.get()
+    budget_ms = _budget_ms.get()
+    if timeout_ms:
+        new = time.monotonic() + timeout_ms / 1000
+        if current is None or new < current:
+            current, budget_ms = new, timeout_ms
+    token = _deadline.set(current)
+    budget_token = _budget_ms.set(budget_ms)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+        _budget_ms.reset(budget_token)
+
+
+def remaining():
+    """
+    Seconds left in the current budget, or None if there is no deadline.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired_budget():
+    """
+    The timeout_ms of the current budget if it has run out, else None.
+    """
+    left = remaining()
+    if left is None or left > 0:
+        return None
+    return _budget_ms.get()
+
+
+async def within_deadline(aw):
+    """
+    Awaits `aw`, raising asyncio.TimeoutError once the budget runs out.
+    """
+    left = remaining()
+    if left is None:
+        return await aw
+    return await asyncio.wait_for(aw, left)
+
+
+def clear_deadline():
+    """
+    Drops the budget for the rest of the current task, for work spawned by
+    a request that has to outlive it.
+    """
+    _deadline.set(None)
+    _budget_ms.set(None)
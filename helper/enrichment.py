@@ -0,0 +1,147 @@
+import asyncio
+import contextvars
+import os
+from collections import deque
+from contextlib import contextmanager
+from .deadline import remaining
+from .scheduler import get_limiter, site_for_url
+
+# Detail-page workers per call when the site has no max_in_flight of its own.
+ENRICH_WORKERS = int(os.environ.get("ENRICH_WORKERS", 8))
+# Enrichment stops this long before the request deadline so the already
+# parsed rows still make it back to the caller.
+ENRICH_DEADLINE_MARGIN_MS = float(os.environ.get("ENRICH_DEADLINE_MARGIN_MS", 250))
+
+# Fields the current request asked for, or None for everything.
+_fields = contextvars.ContextVar("requested_fields", default=None)
+# Set by enrichment_report(); enrich() appends to it when the deadline cut
+# it short.
+_cut_short = contextvars.ContextVar("enrichment_cut_short", default=None)
+
+
+def parse_fields(raw):
+    """
+    Turns a `fields=name,size,seeders` query value into a set (None if absent).
+    """
+    if not raw:
+        return None
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    return fields or None
+
+
+@contextmanager
+def fields_scope(fields):
+    token = _fields.set(fields)
+    try:
+        yield
+    finally:
+        _fields.reset(token)
+
+
+@contextmanager
+def enrichment_report():
+    """
+    Yields a list that gets an entry for every enrich() call inside the
+    block, including in tasks it spawns, that returned rows without their
+    detail pages because the deadline ran out.
+    """
+    cut_short = []
+    token = _cut_short.set(cut_short)
+    try:
+        yield cut_short
+    finally:
+        _cut_short.reset(token)
+
+
+def needs_detail(detail_fields):
+    """
+    Whether the request wants anything that only the detail page has.
+    """
+    fields = _fields.get()
+    return fields is None or bool(fields & set(detail_fields))
+
+
+def project(resp, fields):
+    """
+    Keeps only the requested keys of every row. "url" always stays so rows
+    can be enriched later through /api/v1/enrich.
+    """
+    if fields is None or resp is None:
+        return resp
+    keep = fields | {"url"}
+    resp["data"] = [
+        {k: v for k, v in row.items() if k in keep} for row in resp["data"]
+    ]
+    return resp
+
+
+def _index(rows):
+    """
+    URL -> rows carrying it, in first-seen order. Duplicate URLs are
+    fetched once and fanned out to every row.
+    """
+    index = {}
+    for row in rows:
+        url = row.get("url")
+        if url:
+            index.setdefault(url, []).append(row)
+    return index
+
+
+def _worker_count(url, jobs):
+    limiter = get_limiter(site_for_url(url))
+    workers = ENRICH_WORKERS
+    if limiter is not None and limiter.max_in_flight:
+        workers = limiter.max_in_flight
+    return max(1, min(workers, jobs))
+
+
+def _budget():
+    left = remaining()
+    if left is None:
+        return None
+    return max(0.0, left - ENRICH_DEADLINE_MARGIN_MS / 1000)
+
+
+async def enrich(session, result, scrape, limit=None):
+    """
+    Fills the rows of a parsed `result` in place from their detail pages,
+    using the site's `_individual_scrap(session, url, obj)` as `scrape`.
+
+    Skipped entirely when the request's `fields=` projection asks for none
+    of the scraper's `_DETAIL_FIELDS`. Only the first `limit` rows are
+    enriched. A bounded pool of workers pulls URLs from a queue, so a
+    100-row page never means 100 concurrent tasks. When the request
+    deadline is near, leftover fetches are cancelled and the rows are
+    returned as they are, which enrichment_report() makes visible.
+    """
+    if not needs_detail(getattr(scrape.__self__, "_DETAIL_FIELDS", ())):
+        return result
+    rows = result["data"] if limit is None else result["data"][: max(0, limit)]
+    index = _index(rows)
+    if not index:
+        return result
+    queue = deque(index)
+
+    async def worker():
+        while queue:
+            url = queue.popleft()
+            detail = {}
+            await scrape(session, url, detail)
+            for row in index[url]:
+                row.update(detail)
+
+    workers = [
+        asyncio.ensure_future(worker())
+        for _ in range(_worker_count(next(iter(index)), len(index)))
+    ]
+    try:
+        _, pending = await asyncio.wait(workers, timeout=_budget())
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    cut_short = _cut_short.get()
+    if pending and cut_short is not None:
+        cut_short.append(True)
+    return result
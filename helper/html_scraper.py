@@ -1,19 +1,49 @@
 import os
 import asyncio
 from .asyncioPoliciesFix import decorator_asyncio_fix
+from .scheduler import upstream_slot
+from .singleflight import SingleFlight, normalize_url
+from .deadline import within_deadline
+from .streaming import read_rows
 from constants.headers import HEADER_AIO
 
 HTTP_PROXY = os.environ.get("HTTP_PROXY", None)
 
+# Identical in-flight GETs share one upstream request.
+_inflight = SingleFlight("html")
+
 
 class Scraper:
     @decorator_asyncio_fix
-    async def _get_html(self, session, url):
+    async def _get_html(self, session, url, rows=None):
+        # The request deadline bounds each caller's wait, not the shared
+        # fetch, so a short budget never cuts off a longer-lived waiter.
+        key = normalize_url(url)
+        if rows is not None:
+            key = "{}#{}".format(key, rows.key)
+        try:
+            return await within_deadline(
+                _inflight.do(key, lambda: self._fetch(session, url, rows))
+            )
+        except asyncio.TimeoutError:
+            return None
+
+    async def _fetch(self, session, url, rows=None):
         try:
-            async with session.get(url, headers=HEADER_AIO, proxy=HTTP_PROXY) as r:
-                return await r.text()
+            async with upstream_slot(url):
+                async with session.get(
+                    url, headers=HEADER_AIO, proxy=HTTP_PROXY
+                ) as r:
+                    if rows is not None:
+                        # Stop reading once the caller's rows are complete.
+                        return await read_rows(r, rows)
+                    # Raw bytes go straight to the parser, which decodes
+                    # them once using the page's declared charset.
+                    return await r.read()
         except:
             return None
 
-    async def get_all_results(self, session, url):
-        return await asyncio.gather(asyncio.create_task(self._get_html(session, url)))
+    async def get_all_results(self, session, url, rows=None):
+        return await asyncio.gather(
+            asyncio.create_task(self._get_html(session, url, rows))
+        )
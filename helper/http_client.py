@@ -0,0 +1,54 @@
+import os
+from contextlib import asynccontextmanager
+import aiohttp
+
+# Connection pool tuning, overridable per deployment.
+HTTP_POOL_LIMIT = int(os.environ.get("HTTP_POOL_LIMIT", 100))
+HTTP_POOL_LIMIT_PER_HOST = int(os.environ.get("HTTP_POOL_LIMIT_PER_HOST", 10))
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", 30))
+HTTP_DNS_CACHE_TTL = int(os.environ.get("HTTP_DNS_CACHE_TTL", 300))
+# Upper bound for a single upstream request, replacing aiohttp's 5 minutes.
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", 30))
+
+_session = None
+
+
+async def start_session():
+    """
+    Creates the process-wide pooled client. Called once from the app lifespan.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+@asynccontextmanager
+async def client_session():
+    """
+    Yields the shared pooled session. Outside the app lifespan (scripts,
+    one-off calls) a short-lived session is opened and closed instead.
+    """
+    if _session is not None and not _session.closed:
+        yield _session
+        return
+    async with aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+    ) as session:
+        yield session
@@ -14,6 +14,7 @@ from torrents.x1337 import x1337
 from torrents.your_bittorrent import YourBittorrent
 from torrents.yts import Yts
 from torrents.zooqle import Zooqle
+from helper import scheduler
 
 all_sites = {
     "1337x": {
@@ -35,6 +36,8 @@ all_sites = {
             "movies",
         ],
         "limit": 100,
+        "max_in_flight": 8,
+        "rate_limit": 5,
     },
     "torlock": {
         "website": Torlock,
@@ -57,6 +60,8 @@ all_sites = {
             "images",
         ],  # ebooks
         "limit": 50,
+        "max_in_flight": 6,
+        "rate_limit": 4,
     },
     "zooqle": {
         "website": Zooqle,
@@ -67,6 +72,8 @@ all_sites = {
         "recent_category_available": False,
         "categories": [],
         "limit": 30,
+        "max_in_flight": 4,
+        "rate_limit": 2,
     },
     "magnetdl": {
         "website": Magnetdl,
@@ -78,6 +85,8 @@ all_sites = {
         # e-books
         "categories": ["apps", "movies", "music", "games", "tv", "books"],
         "limit": 40,
+        "max_in_flight": 2,
+        "rate_limit": 1,
     },
     "tgx": {
         "website": TorrentGalaxy,
@@ -99,6 +108,8 @@ all_sites = {
             "books",
         ],
         "limit": 50,
+        "max_in_flight": 4,
+        "rate_limit": 3,
     },
     "nyaasi": {
         "website": NyaaSi,
@@ -109,6 +120,8 @@ all_sites = {
         "recent_category_available": False,
         "categories": [],
         "limit": 50,
+        "max_in_flight": 4,
+        "rate_limit": 3,
     },
     "piratebay": {
         "website": PirateBay,
@@ -119,6 +132,8 @@ all_sites = {
         "recent_category_available": True,
         "categories": ["tv"],
         "limit": 50,
+        "max_in_flight": 4,
+        "rate_limit": 3,
     },
     "bitsearch": {
         "website": Bitsearch,
@@ -129,6 +144,8 @@ all_sites = {
         "recent_category_available": False,
         "categories": [],
         "limit": 50,
+        "max_in_flight": 4,
+        "rate_limit": 3,
     },
     "kickass": {
         "website": Kickass,
@@ -150,6 +167,8 @@ all_sites = {
             "books",
         ],  # television applications
         "limit": 50,
+        "max_in_flight": 6,
+        "rate_limit": 4,
     },
     "libgen": {
         "website": Libgen,
@@ -160,6 +179,8 @@ all_sites = {
         "recent_category_available": False,
         "categories": [],
         "limit": 25,
+        "max_in_flight": 3,
+        "rate_limit": 2,
     },
     "yts": {
         "website": Yts,
@@ -170,6 +191,8 @@ all_sites = {
         "recent_category_available": False,
         "categories": [],
         "limit": 20,
+        "max_in_flight": 6,
+        "rate_limit": 4,
     },
     "limetorrent": {
         "website": Limetorrent,
@@ -189,6 +212,8 @@ all_sites = {
             "books",
         ],  # applications and tv-shows
         "limit": 50,
+        "max_in_flight": 6,
+        "rate_limit": 4,
     },
     "torrentfunk": {
         "website": TorrentFunk,
@@ -208,6 +233,8 @@ all_sites = {
             "books",
         ],  # television # software #adult # ebooks
         "limit": 50,
+        "max_in_flight": 6,
+        "rate_limit": 4,
     },
     "glodls": {
         "website": Glodls,
@@ -218,6 +245,8 @@ all_sites = {
         "recent_category_available": False,
         "categories": [],
         "limit": 45,
+        "max_in_flight": 4,
+        "rate_limit": 2,
     },
     "torrentproject": {
         "website": TorrentProject,
@@ -228,6 +257,8 @@ all_sites = {
         "recent_category_available": False,
         "categories": [],
         "limit": 20,
+        "max_in_flight": 3,
+        "rate_limit": 2,
     },
     "ybt": {
         "website": YourBittorrent,
@@ -249,9 +280,24 @@ all_sites = {
             "other",
         ],  # book -> ebooks
         "limit": 20,
+        "max_in_flight": 6,
+        "rate_limit": 4,
     },
 }
 
+# Per-site upstream budgets: at most `max_in_flight` concurrent requests and
+# `rate_limit` requests per second, shared by listing and detail fetches.
+scheduler.configure(
+    {
+        key: (
+            site_info["website"]().BASE_URL,
+            site_info["max_in_flight"],
+            site_info["rate_limit"],
+        )
+        for key, site_info in all_sites.items()
+    }
+)
+
 sites_config = {
     key: {
         **site_info, 
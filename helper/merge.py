@@ -0,0 +1,76 @@
+import base64
+import binascii
+import re
+
+_BTIH = re.compile(r"urn:btih:([a-z\d]{32,40})", re.IGNORECASE)
+_HEX = re.compile(r"[a-f\d]{40}")
+_BASE32 = re.compile(r"[a-z2-7]{32}")
+
+
+def infohash(row):
+    """
+    The row's v1 infohash as lowercase hex, from its `hash` or its magnet
+    link; base32 btih values are converted. None when the row has neither.
+    """
+    candidates = [row.get("hash")]
+    match = _BTIH.search(row.get("magnet") or "")
+    if match is not None:
+        candidates.append(match.group(1))
+    for value in candidates:
+        if not isinstance(value, str):
+            continue
+        value = value.strip().lower()
+        if _HEX.fullmatch(value):
+            return value
+        if _BASE32.fullmatch(value):
+            try:
+                return binascii.hexlify(base64.b32decode(value.upper())).decode()
+            except binascii.Error:
+                continue
+    return None
+
+
+def _richness(row):
+    return sum(1 for value in row.values() if value not in (None, "", [], {}))
+
+
+def _peak(rows, key):
+    counts = [row[key] for row in rows if isinstance(row.get(key), int)]
+    return max(counts) if counts else None
+
+
+def merge_by_infohash(batches):
+    """
+    Merges rows from several sites that share an infohash. `batches` is an
+    iterable of (site, rows). The merged record is the richest row of the
+    group, with the highest seeders / leechers any source reported and a
+    `sources` list of every site and url that had it. Rows without an
+    infohash are kept unmerged with a single source; order is first-seen.
+    """
+    merged = []
+    groups = {}
+    for site, rows in batches:
+        for row in rows:
+            source = {"site": site, "url": row.get("url")}
+            key = infohash(row)
+            if key is None:
+                merged.append(dict(row, sources=[source]))
+                continue
+            if key not in groups:
+                groups[key] = ([], [])
+                merged.append(key)
+            groups[key][0].append(row)
+            groups[key][1].append(source)
+    for i, item in enumerate(merged):
+        if not isinstance(item, str):
+            continue
+        rows, sources = groups[item]
+        record = dict(max(rows, key=_richness))
+        for key in ("seeders", "leechers"):
+            peak = _peak(rows, key)
+            if peak is not None:
+                record[key] = peak
+        record["hash"] = item
+        record["sources"] = sources
+        merged[i] = record
+    return merged
@@ -0,0 +1,126 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+_SIZE = re.compile(r"([\d.,]+)\s*([kmgtp]?)(i?)b", re.IGNORECASE)
+_AGE = re.compile(
+    r"(\d+|an?)\s*(sec|min|hour|hr|day|week|month|year|yr)s?\.?(\s+ago)?$",
+    re.IGNORECASE,
+)
+_ORDINAL = re.compile(r"(\d)(st|nd|rd|th)\b")
+
+_UNITS = {"": 0, "k": 1, "m": 2, "g": 3, "t": 4, "p": 5}
+_AGE_SECONDS = {
+    "sec": 1,
+    "min": 60,
+    "hour": 3600,
+    "hr": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 30 * 86400,
+    "year": 365 * 86400,
+    "yr": 365 * 86400,
+}
+_DAY_WORDS = {"today": 0, "y-day": 1, "yesterday": 1}
+
+
+def parse_size(text):
+    """
+    "1.4 GB", "700,5 MiB", "10 Mb" -> bytes. Sites mean binary units
+    whether or not they write the "i".
+    """
+    match = _SIZE.search(text or "")
+    if match is None:
+        return None
+    number, unit, _ = match.groups()
+    if "," in number and "." not in number:
+        head, _, tail = number.rpartition(",")
+        # "1,234" groups thousands, "1,2" is a decimal comma.
+        number = number.replace(",", "") if len(tail) == 3 else head + "." + tail
+    try:
+        return int(float(number.replace(",", "")) * 1024 ** _UNITS[unit.lower()])
+    except ValueError:
+        return None
+
+
+def parse_count(text):
+    if isinstance(text, int):
+        return text
+    digits = re.sub(r"[^\d]", "", text or "")
+    return int(digits) if digits else None
+
+
+def _clean_date(text):
+    return " ".join(_ORDINAL.sub(r"\1", text).replace(".", "").split())
+
+
+def parse_date(text, formats=(), now=None):
+    """
+    A listing date -> UTC epoch seconds, or None. Ages ("3 days ago",
+    "Y-day 10:00") work for every site; absolute dates are tried against
+    the site's strptime `formats`. Formats without a year take the current
+    one and formats without a day take today.
+    """
+    if not text:
+        return None
+    now = now or datetime.now(timezone.utc)
+    text = _clean_date(text)
+    age = _AGE.match(text)
+    if age is not None:
+        count, unit = age.group(1), age.group(2).lower()
+        count = 1 if count.lower() in ("a", "an") else int(count)
+        return int(now.timestamp()) - count * _AGE_SECONDS[unit]
+    word, _, rest = text.partition(" ")
+    if word.lower() in _DAY_WORDS:
+        day = now - timedelta(days=_DAY_WORDS[word.lower()])
+        try:
+            clock = datetime.strptime(rest, "%H:%M")
+        except ValueError:
+            clock = datetime(1900, 1, 1)
+        stamp = day.replace(hour=clock.hour, minute=clock.minute, second=0)
+        return int(stamp.timestamp())
+    for fmt in formats:
+        try:
+            stamp = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if "%y" not in fmt and "%Y" not in fmt:
+            stamp = stamp.replace(year=now.year)
+            if "%d" not in fmt:
+                stamp = stamp.replace(month=now.month, day=now.day)
+        return int(stamp.replace(tzinfo=timezone.utc).timestamp())
+    return None
+
+
+def normalize(rows, date_formats=()):
+    """
+    Adds typed fields to a whole result set in one pass: `size_bytes`,
+    integer `seeders` / `leechers` and `uploaded_at` (UTC epoch seconds).
+    Values that can't be read are left as they were; sizes and dates repeat
+    a lot within a page, so each distinct string is parsed once.
+    """
+    now = datetime.now(timezone.utc)
+    sizes = {}
+    dates = {}
+
+    def size_of(text):
+        if text not in sizes:
+            sizes[text] = parse_size(text)
+        return sizes[text]
+
+    for row in rows:
+        if "size" in row:
+            row["size_bytes"] = size_of(row["size"])
+        for key in ("seeders", "leechers"):
+            if key in row:
+                count = parse_count(row[key])
+                if count is not None:
+                    row[key] = count
+        date = row.get("date")
+        if isinstance(date, str):
+            if date not in dates:
+                dates[date] = parse_date(date, date_formats, now)
+            row["uploaded_at"] = dates[date]
+        for torrent in row.get("torrents") or ():
+            if isinstance(torrent, dict) and "size" in torrent:
+                torrent["size_bytes"] = size_of(torrent["size"])
+    return rows
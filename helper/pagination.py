@@ -0,0 +1,51 @@
+import asyncio
+import math
+import os
+
+# Most follow-up pages requested at once while filling a limit.
+PAGINATION_MAX_PAGES = int(os.environ.get("PAGINATION_MAX_PAGES", 4))
+
+
+def _pages_after(first, next_page, missing, per_page):
+    count = min(math.ceil(missing / per_page), PAGINATION_MAX_PAGES)
+    total_pages = first.get("total_pages")
+    if isinstance(total_pages, int):
+        count = min(count, total_pages - next_page + 1)
+    return count
+
+
+async def fill_limit(first, page, limit, load_page):
+    """
+    Tops up `first`, the parsed result of `page`, to `limit` rows from the
+    pages after it.
+
+    `load_page(page, wanted)` fetches, parses and enriches one page (at most
+    `wanted` of its rows) and returns its result or None. How many pages are
+    needed is worked out from the size of the first page and its
+    `total_pages`; those pages load concurrently, so each one is parsed and
+    enriched while the others are still downloading. Rows are appended in
+    page order and the first empty or failed page ends the walk.
+    """
+    per_page = len(first["data"])
+    next_page = page + 1
+    while per_page and len(first["data"]) < limit:
+        missing = limit - len(first["data"])
+        count = _pages_after(first, next_page, missing, per_page)
+        if count <= 0:
+            break
+        results = await asyncio.gather(
+            *[
+                load_page(next_page + i, missing - i * per_page)
+                for i in range(count)
+            ],
+            return_exceptions=True,
+        )
+        next_page += count
+        for result in results:
+            if isinstance(result, BaseException) or not result or not result["data"]:
+                per_page = 0
+                break
+            first["data"].extend(result["data"][: limit - len(first["data"])])
+            if "current_page" in result:
+                first["current_page"] = result["current_page"]
+    return first
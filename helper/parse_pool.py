@@ -0,0 +1,69 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+# Worker processes used for CPU-bound HTML parsing; 0 parses inline.
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", 2))
+# Pages smaller than this are cheaper to parse inline than to ship over.
+PARSE_INLINE_MAX_BYTES = int(os.environ.get("PARSE_INLINE_MAX_BYTES", 64 * 1024))
+# multiprocessing start method for the workers. The default avoids "fork":
+# the pool starts after the telemetry exporter threads, and forking a
+# threaded process can deadlock the child.
+PARSE_START_METHOD = os.environ.get("PARSE_START_METHOD", "") or (
+    "forkserver"
+    if "forkserver" in multiprocessing.get_all_start_methods()
+    else "spawn"
+)
+
+_pool = None
+
+
+def _warm_up():
+    """
+    Runs once in every worker so the first real page doesn't pay for
+    importing the scrapers and the parser backend.
+    """
+    import helper.is_site_available  # noqa: F401
+    from helper.parser import make_soup
+
+    make_soup(b"<html><body><table><tr><td>warm</td></tr></table></body></html>")
+    return os.getpid()
+
+
+async def start_pool():
+    global _pool
+    if PARSE_WORKERS <= 0 or _pool is not None:
+        return
+    context = multiprocessing.get_context(PARSE_START_METHOD)
+    _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=context)
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *[loop.run_in_executor(_pool, _warm_up) for _ in range(PARSE_WORKERS)]
+    )
+
+
+def stop_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+    _pool = None
+
+
+async def parse(parser, htmls, *args):
+    """
+    Runs a scraper's bound `_parser` on raw pages and returns its plain
+    result. Large pages go to the worker pool (the scraper instance only
+    carries BASE_URL and LIMIT, so it pickles cheaply); small pages, or any
+    call made without a running pool, are parsed inline.
+    """
+    size = sum(len(html) for html in htmls if html)
+    if _pool is None or size < PARSE_INLINE_MAX_BYTES:
+        return parser(htmls, *args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_pool, partial(parser, htmls, *args))
+    except BrokenProcessPool:
+        return parser(htmls, *args)
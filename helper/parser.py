@@ -0,0 +1,97 @@
+import os
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Tree builder used by every scraper: "lxml" (C-backed, default) or the
+# pure-Python "html.parser".
+HTML_PARSER = os.environ.get("HTML_PARSER", "lxml")
+FALLBACK_PARSER = "html.parser"
+
+
+def _resolve(backend):
+    if backend == "lxml":
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            return FALLBACK_PARSER
+    return backend
+
+
+_backend = _resolve(HTML_PARSER)
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Switches the parser backend at runtime (benchmarks, debugging).
+    """
+    global _backend
+    _backend = _resolve(backend)
+
+
+def make_soup(markup, parse_only=None):
+    """
+    Builds a soup from raw response bytes (or text) with the configured
+    backend. Bytes are decoded by the parser itself using the charset the
+    page declares.
+    """
+    return BeautifulSoup(markup, _backend, parse_only=parse_only)
+
+
+class Extract(SoupStrainer):
+    """
+    Declarative extraction spec for partial parsing. Each rule is a tag name,
+    an attribute dict or a (name, attrs) pair; only subtrees rooted at a tag
+    matching any rule are built, everything else is skipped while parsing.
+    A "class" rule matches one of the tag's classes, True matches presence.
+    """
+
+    def __init__(self, *rules):
+        super().__init__()
+        self.rules = [self._rule(rule) for rule in rules]
+
+    @staticmethod
+    def _rule(rule):
+        if isinstance(rule, str):
+            return rule, {}
+        if isinstance(rule, dict):
+            return None, rule
+        return rule
+
+    @staticmethod
+    def _attr_matches(key, expected, value):
+        if value is None:
+            return False
+        if expected is True:
+            return True
+        if key == "class":
+            classes = value.split() if isinstance(value, str) else value
+            return expected in classes
+        return value == expected
+
+    def wants(self, name, attrs):
+        attrs = attrs or {}
+        for rule_name, rule_attrs in self.rules:
+            if rule_name is not None and rule_name != name:
+                continue
+            if all(
+                self._attr_matches(key, expected, attrs.get(key))
+                for key, expected in rule_attrs.items()
+            ):
+                return True
+        return False
+
+    # bs4 >= 4.13 consults these while building the tree.
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.wants(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # Older bs4 releases call search_tag() with the raw name and attrs.
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        if isinstance(markup_name, str):
+            return self.wants(markup_name, markup_attrs)
+        return super().search_tag(markup_name, markup_attrs)
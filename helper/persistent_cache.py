@@ -0,0 +1,227 @@
+import asyncio
+import datetime
+import json
+import os
+from opentelemetry.metrics import get_meter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Write-through copy of the result cache in cache.db, so a restart doesn't
+# start from nothing. "0" turns it off.
+PERSIST_CACHE = os.environ.get("PERSIST_CACHE", "1") == "1"
+# How often queued results are written, and the most written per batch.
+PERSIST_FLUSH_MS = int(os.environ.get("PERSIST_FLUSH_MS", 1000))
+PERSIST_BATCH = int(os.environ.get("PERSIST_BATCH", 200))
+
+_MIGRATION_LOCK = "cache.db.migrate.lock"
+# SQLite caps the number of bound parameters per statement.
+_IN_CHUNK = 500
+
+
+def _now():
+    return datetime.datetime.utcnow()
+
+
+def _encode_key(key):
+    return json.dumps(list(key), separators=(",", ":"))
+
+
+def _migrate():
+    """
+    Brings cache.db up to the latest alembic revision. Every gunicorn
+    worker does this on start, so they take turns on a lock file.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    with open(_MIGRATION_LOCK, "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        command.upgrade(Config("alembic.ini"), "head")
+
+
+def _read(keys):
+    from db.db import SessionLocal
+    from db.models import CachedResult
+
+    now = _now()
+    with SessionLocal() as db:
+        for key in keys:
+            row = db.get(CachedResult, _encode_key(key))
+            if row is not None and row.expiresAt > now:
+                return (
+                    json.loads(row.payload),
+                    (now - row.storedAt).total_seconds(),
+                    (row.expiresAt - now).total_seconds(),
+                )
+    return None
+
+
+def _chunks(values):
+    values = list(values)
+    for i in range(0, len(values), _IN_CHUNK):
+        yield values[i : i + _IN_CHUNK]
+
+
+def _upsert_items(db, site, rows, now):
+    """
+    Records every release with a magnet link in `items`, one row per
+    (provider, magnet); known ones only get their name and updatedAt bumped.
+    """
+    from db.models import Item
+
+    by_magnet = {}
+    for row in rows:
+        magnet = row.get("magnet")
+        if isinstance(magnet, str) and magnet:
+            by_magnet.setdefault(magnet, row)
+    for magnets in _chunks(by_magnet):
+        known = {
+            item.magnetLink: item
+            for item in db.query(Item).filter(
+                Item.provider == site, Item.magnetLink.in_(magnets)
+            )
+        }
+        for magnet in magnets:
+            item = known.get(magnet)
+            if item is None:
+                item = Item(provider=site, magnetLink=magnet, createdAt=now)
+                db.add(item)
+            item.name = by_magnet[magnet].get("name")
+            item.updatedAt = now
+            item.functional = True
+
+
+def _write(batch):
+    from db.db import SessionLocal
+    from db.models import CachedResult
+
+    now = _now()
+    with SessionLocal() as db:
+        for key, value, ttl in batch:
+            db.merge(
+                CachedResult(
+                    key=_encode_key(key),
+                    site=key[0],
+                    endpoint=key[1],
+                    query=key[2],
+                    category=key[3],
+                    payload=json.dumps(value, separators=(",", ":")),
+                    storedAt=now,
+                    expiresAt=now + datetime.timedelta(seconds=ttl),
+                )
+            )
+            _upsert_items(db, key[0], value["data"], now)
+        db.query(CachedResult).filter(CachedResult.expiresAt <= now).delete()
+        db.commit()
+
+
+def _delete(site):
+    from db.db import SessionLocal
+    from db.models import CachedResult
+
+    with SessionLocal() as db:
+        query = db.query(CachedResult)
+        if site is not None:
+            query = query.filter(CachedResult.site == site)
+        deleted = query.delete()
+        db.commit()
+    return deleted
+
+
+class PersistentCache:
+    """
+    SQLite tier under the in-memory result cache. Reads go to a worker
+    thread; writes are queued and committed in batches by a background
+    task, never on the request path.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._queue = []
+        self._task = None
+
+    async def start(self):
+        if not PERSIST_CACHE:
+            return
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(None, _migrate)
+        except Exception:
+            error_counter.add(1, {"op": "migrate"})
+            return
+        self.enabled = True
+        self._task = asyncio.ensure_future(self._flush_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._queue:
+            await self._flush()
+        self.enabled = False
+
+    async def get(self, *keys):
+        """
+        (value, age, seconds left) in seconds for the first of `keys` stored
+        and unexpired, or None.
+        """
+        if not self.enabled:
+            return None
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(None, _read, keys)
+        except Exception:
+            error_counter.add(1, {"op": "read"})
+            return None
+
+    async def clear(self, site=None):
+        """
+        Drops every stored result, or only those of `site`, queued writes
+        included. Returns how many rows went, None if that failed.
+        """
+        if not self.enabled:
+            return 0
+        self._queue = [
+            item for item in self._queue if site is not None and item[0][0] != site
+        ]
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(None, _delete, site)
+        except Exception:
+            error_counter.add(1, {"op": "delete"})
+            return None
+
+    def put(self, key, value, ttl):
+        if self.enabled and ttl > 0:
+            self._queue.append((key, dict(value, data=list(value["data"])), ttl))
+
+    async def _flush(self):
+        batch = self._queue[:PERSIST_BATCH]
+        del self._queue[: len(batch)]
+        if not batch:
+            return
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(None, _write, batch)
+        except Exception:
+            error_counter.add(1, {"op": "write"})
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(PERSIST_FLUSH_MS / 1000)
+            while self._queue:
+                await self._flush()
+
+
+meter = get_meter(__name__)
+error_counter = meter.create_counter(
+    "persistent_cache_errors",
+    description="Failed cache.db migrations, reads, writes and deletes",
+)
+
+persistent_cache = PersistentCache()
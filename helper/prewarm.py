@@ -0,0 +1,187 @@
+import asyncio
+import itertools
+import logging
+import os
+import random
+import time
+from opentelemetry.metrics import get_meter
+from helper.cache import cache_key, result_cache
+from helper.is_site_available import all_sites
+from helper.shared_cache import shared_cache
+from helper.site_runner import refresh_site
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Re-scrapes every trending / recent listing users can ask for, so those
+# endpoints are answered from the cache. "0" turns it off.
+PREWARM = os.environ.get("PREWARM", "1") == "1"
+# Shortest round over a site's listings, in seconds; rounds of sites that
+# enrich stretch to fit their rate share. Each site keeps as many listings
+# as it can revisit before they expire (TTL + stale TTL), uncategorised
+# ones first.
+PREWARM_PERIOD_S = float(os.environ.get("PREWARM_PERIOD_S", 240))
+# How late each refresh may start after its even slot, as a fraction of one.
+PREWARM_JITTER = float(os.environ.get("PREWARM_JITTER", 0.5))
+# Share of each site's rate_limit pre-warming may use on average; the rest
+# is left to user requests.
+PREWARM_RATE_SHARE = float(os.environ.get("PREWARM_RATE_SHARE", 0.25))
+# Only the worker holding this lock pre-warms; the others read what it
+# scraped from the shared cache, and take over if it goes away.
+PREWARM_LOCK = os.environ.get("PREWARM_LOCK", "cache.prewarm.lock")
+
+
+def listings():
+    """
+    {site: [(method, category), ...]} for every listing the trending and
+    recent endpoints accept, None being the uncategorised one.
+    """
+    per_site = {}
+    for site, config in all_sites.items():
+        if not config["website"]:
+            continue
+        jobs = []
+        for method, available, by_category in (
+            ("trending", "trending_available", "trending_category"),
+            ("recent", "recent_available", "recent_category_available"),
+        ):
+            if not config[available]:
+                continue
+            jobs.append((method, None))
+            if config[by_category]:
+                jobs.extend((method, c) for c in config["categories"])
+        if jobs:
+            per_site[site] = jobs
+    return per_site
+
+
+def _cost(site):
+    """
+    Rough upstream requests per refresh: the listing, plus a detail page
+    per row for sites that enrich.
+    """
+    config = all_sites[site]
+    if hasattr(config["website"], "_individual_scrap"):
+        return 1 + config["limit"]
+    return 1
+
+
+class Prewarmer:
+    """
+    Cycles through each site's listings, one site per task, refreshing
+    those that won't stay fresh until the site's next round. A site's
+    refreshes start an even slot of the period apart, shifted by a random
+    jitter, and never closer than its share of the site's rate_limit
+    allows.
+    """
+
+    def __init__(self, period=None, jitter=None, rate_share=None):
+        self.period = PREWARM_PERIOD_S if period is None else period
+        self.jitter = PREWARM_JITTER if jitter is None else jitter
+        self.rate_share = PREWARM_RATE_SHARE if rate_share is None else rate_share
+        self._task = None
+        self._lock = None
+
+    def start(self):
+        if PREWARM and self.period > 0 and self._task is None:
+            self._task = asyncio.ensure_future(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def _lead(self):
+        """
+        Whether this worker holds (or just took) the pre-warm lock.
+        """
+        if fcntl is None or self._lock is not None:
+            return True
+        lock = open(PREWARM_LOCK, "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return False
+        self._lock = lock
+        return True
+
+    def plan(self, site, jobs):
+        """
+        (jobs, spacing, revisit) for `site`: the listings it keeps, the
+        seconds between two refreshes, and the most seconds between two
+        visits of the same listing. Listings are dropped, categorised ones
+        first, until that fits in the shortest TTL + stale TTL among them.
+        """
+        limit = all_sites[site]["limit"]
+        rate = (all_sites[site].get("rate_limit") or 0) * self.rate_share
+        gap = _cost(site) / rate if rate > 0 else 0
+        horizon = min(
+            result_cache.ttl_for(key) + result_cache.stale_ttl_for(key)
+            for key in (cache_key(site, method, (None, 1, limit)) for method, _ in jobs)
+        )
+        keep = len(jobs)
+        while keep > 1 and gap * (keep + self.jitter) > horizon:
+            keep -= 1
+        if keep < len(jobs):
+            logger.warning(
+                "pre-warming %d of %d %s listings to fit its rate share",
+                keep, len(jobs), site,
+            )
+            jobs = sorted(jobs, key=lambda job: job[1] is not None)[:keep]
+        spacing = max(self.period / keep, gap)
+        revisit = spacing * (keep + self.jitter)
+        if revisit > horizon:
+            logger.warning(
+                "%s listings are revisited every %.0fs but expire after %.0fs",
+                site, revisit, horizon,
+            )
+        return jobs, spacing, revisit
+
+    def _fresh(self, key, revisit):
+        left = [result_cache.fresh_for(key), shared_cache.fresh_for(key)]
+        return max(t or 0 for t in left) > revisit
+
+    async def _run_forever(self):
+        while not self._lead():
+            await asyncio.sleep(self.period)
+        await asyncio.gather(
+            *(self._warm_site(site, jobs) for site, jobs in listings().items())
+        )
+
+    async def _warm_site(self, site, jobs):
+        limit = all_sites[site]["limit"]
+        jobs, spacing, revisit = self.plan(site, jobs)
+        # Refreshes start on a fixed grid, so jitter never adds up over a
+        # round; sites start at random points of their first slot.
+        start = time.monotonic() + random.uniform(0, spacing)
+        for i, (method, category) in enumerate(itertools.cycle(jobs)):
+            at = start + (i + random.uniform(0, self.jitter)) * spacing
+            await asyncio.sleep(max(0.0, at - time.monotonic()))
+            key = cache_key(site, method, (category, 1, limit))
+            if self._fresh(key, revisit):
+                continue
+            site_state = await refresh_site(site, method, category, 1, limit)
+            refresh_counter.add(
+                1, {"site": site, "endpoint": method, "status": site_state}
+            )
+            # A refresh that ran long moves the grid rather than bunching
+            # up the ones after it.
+            start = max(start, time.monotonic() - (i + 1) * spacing)
+
+
+meter = get_meter(__name__)
+refresh_counter = meter.create_counter(
+    "prewarm_refreshes",
+    description="Background trending / recent refreshes by site and status",
+)
+
+prewarmer = Prewarmer()
@@ -0,0 +1,73 @@
+import asyncio
+import heapq
+import os
+import time
+from helper.merge import infohash
+from helper.site_runner import stream_sites, OK, SKIPPED
+
+# How long a ranked combo request keeps waiting for slow sites once it
+# already holds `limit` candidates. Unset, it waits for every site within
+# the budget: sites that fetch detail pages answer last, often with the
+# best rows.
+COMBO_GRACE_MS = os.environ.get("COMBO_GRACE_MS")
+COMBO_GRACE_MS = int(COMBO_GRACE_MS) if COMBO_GRACE_MS else None
+
+# sort= value -> normalized field, always best (largest / newest) first.
+SORT_FIELDS = {"seeders": "seeders", "size": "size_bytes", "date": "uploaded_at"}
+
+
+def sort_key(sort):
+    field = SORT_FIELDS[sort]
+
+    def key(row):
+        value = row.get(field)
+        # Rows the site gave no usable value for rank after all others.
+        if isinstance(value, int):
+            return (1, value)
+        return (0, 0)
+
+    return key
+
+
+def top_k(rows, limit, key):
+    """
+    The `limit` best rows by `key`, best first, ties in input order. Uses a
+    heap bounded to `limit` entries; a falsy `limit` sorts everything.
+    """
+    if not limit:
+        return sorted(rows, key=key, reverse=True)
+    return heapq.nlargest(limit, rows, key=key)
+
+
+async def run_sites_ranked(calls, timeout_ms, limit, grace_ms=None):
+    """
+    run_sites for a request that only keeps the `limit` best rows. Sites are
+    consumed as they finish; with a `grace_ms`, once `limit` distinct
+    releases have arrived, sites that are still running get that much more
+    to beat them. Those that don't are reported as skipped and left to
+    finish into the cache, so a repeat request can rank them.
+    """
+    if grace_ms is None:
+        grace_ms = COMBO_GRACE_MS
+    results = {}
+    seen = set()
+    cutoff = None
+    stream = stream_sites(calls, timeout_ms, detach=True)
+    try:
+        while True:
+            wait = None if cutoff is None else max(0.0, cutoff - time.monotonic())
+            try:
+                site, site_state, res, _ = await asyncio.wait_for(
+                    stream.__anext__(), wait
+                )
+            except (StopAsyncIteration, asyncio.TimeoutError):
+                break
+            results[site] = (site_state, res)
+            if site_state != OK or not limit or grace_ms is None:
+                continue
+            seen.update(infohash(row) or row.get("url") for row in res["data"])
+            if cutoff is None and len(seen) >= limit:
+                cutoff = time.monotonic() + grace_ms / 1000
+    finally:
+        await stream.aclose()
+    return {site: results.get(site, (SKIPPED, None)) for site in calls}
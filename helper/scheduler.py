@@ -0,0 +1,107 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+# site key -> (base_url, max_in_flight, rate_limit); filled from all_sites.
+_sites = {}
+_limiters = {}
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class SiteLimiter:
+    """
+    Caps the number of in-flight requests to one site and paces them
+    through a token bucket. Either limit may be disabled with 0/None.
+    """
+
+    def __init__(self, max_in_flight=None, rate_limit=None):
+        self.max_in_flight = max_in_flight
+        self.rate_limit = rate_limit
+        self.semaphore = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+        self.bucket = TokenBucket(rate_limit) if rate_limit else None
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.semaphore is None:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            yield
+            return
+        async with self.semaphore:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            yield
+
+
+def configure(sites):
+    """
+    Registers per-site limits as {key: (base_url, max_in_flight, rate_limit)}.
+    Existing limiters are dropped so the new limits take effect.
+    """
+    _sites.clear()
+    _sites.update(sites)
+    _limiters.clear()
+
+
+def site_for_url(url):
+    """
+    Resolves the site key owning `url` by longest matching BASE_URL prefix.
+    """
+    best, best_len = None, 0
+    for key, (base_url, _, _) in _sites.items():
+        if url.startswith(base_url) and len(base_url) > best_len:
+            best, best_len = key, len(base_url)
+    return best
+
+
+def get_limiter(site):
+    if site not in _sites:
+        return None
+    # Limiters hold asyncio primitives, so keep one per running loop.
+    loop = asyncio.get_running_loop()
+    cached = _limiters.get(site)
+    if cached is None or cached[0] is not loop:
+        _, max_in_flight, rate_limit = _sites[site]
+        cached = _limiters[site] = (loop, SiteLimiter(max_in_flight, rate_limit))
+    return cached[1]
+
+
+@asynccontextmanager
+async def upstream_slot(url):
+    """
+    Waits for a concurrency slot and a rate token for the site behind `url`.
+    URLs that belong to no configured site pass straight through.
+    """
+    limiter = get_limiter(site_for_url(url))
+    if limiter is None:
+        yield
+        return
+    async with limiter.slot():
+        yield
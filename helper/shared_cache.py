@@ -0,0 +1,296 @@
+import binascii
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from opentelemetry.metrics import get_meter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Result cache shared by every worker on the host through a memory-mapped
+# file. "0" turns it off; it is also off where fcntl isn't available.
+SHARED_CACHE = os.environ.get("SHARED_CACHE", "1") == "1"
+SHARED_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH", "cache.shm")
+# Bytes of serialized results held, and how many entries can point at them.
+SHARED_CACHE_BYTES = int(os.environ.get("SHARED_CACHE_BYTES", 64 * 1024 * 1024))
+SHARED_CACHE_SLOTS = int(os.environ.get("SHARED_CACHE_SLOTS", 4096))
+
+_MAGIC = b"TAPISHM1"
+# magic, slot count, ring size, head: total bytes ever reserved in the ring,
+# generation: bumped by every clear().
+_HEADER = struct.Struct("<8sIQQQ")
+_HEADER_SIZE = 64
+_HEAD_AT = 20
+_GENERATION_AT = 28
+# seq, key digest, ring position, length, site crc, fresh until, expires at.
+_SLOT = struct.Struct("<Q16sQIIdd")
+_SLOT_SIZE = 64
+_SEQ = struct.Struct("<Q")
+# Slots a key may live in, starting at its hashed one.
+_WAYS = 4
+_READ_RETRIES = 4
+
+
+def _digest(key):
+    return hashlib.blake2b(
+        json.dumps(list(key), separators=(",", ":")).encode(), digest_size=16
+    ).digest()
+
+
+def _site_crc(site):
+    return binascii.crc32(site.encode())
+
+
+class SharedCache:
+    """
+    Results serialized once into a ring buffer in a shared file, found
+    through a table of fixed-size slots. Writers hold an flock on the file;
+    readers take no lock and instead check each slot's sequence number
+    (odd while it is being written) and that the ring hasn't wrapped over
+    the bytes they copied.
+    """
+
+    def __init__(self, path=None, ring_size=None, slots=None):
+        self.path = path or SHARED_CACHE_PATH
+        self.ring_size = ring_size or SHARED_CACHE_BYTES
+        self.slots = max(_WAYS, slots or SHARED_CACHE_SLOTS)
+        self.enabled = False
+        self._fd = None
+        self._mm = None
+        self._generation = 0
+        self._ring_at = _HEADER_SIZE + self.slots * _SLOT_SIZE
+
+    def start(self):
+        if not SHARED_CACHE or fcntl is None or self._mm is not None:
+            return
+        size = self._ring_at + self.ring_size
+        try:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size != size:
+                    os.ftruncate(self._fd, 0)
+                    os.ftruncate(self._fd, size)
+                self._mm = mmap.mmap(self._fd, size)
+                magic, slots, ring_size, _, _ = _HEADER.unpack_from(self._mm, 0)
+                if (magic, slots, ring_size) != (_MAGIC, self.slots, self.ring_size):
+                    # Another layout, or a new file: start empty.
+                    self._mm[: self._ring_at] = bytes(self._ring_at)
+                    _HEADER.pack_into(
+                        self._mm, 0, _MAGIC, self.slots, self.ring_size, 0, 0
+                    )
+                self._generation = self._read_generation()
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        except (OSError, ValueError):
+            error_counter.add(1, {"op": "open"})
+            self.stop()
+            return
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _read_generation(self):
+        return _SEQ.unpack_from(self._mm, _GENERATION_AT)[0]
+
+    def flushed_elsewhere(self):
+        """
+        Whether another worker has cleared the shared cache since this one
+        last looked, in which case its own memory tier is out of date too.
+        """
+        if not self.enabled:
+            return False
+        generation = self._read_generation()
+        if generation == self._generation:
+            return False
+        self._generation = generation
+        return True
+
+    def _bucket(self, digest):
+        first = int.from_bytes(digest[:8], "little") % self.slots
+        for i in range(_WAYS):
+            yield _HEADER_SIZE + (first + i) % self.slots * _SLOT_SIZE
+
+    def _read_slot(self, at):
+        """
+        A consistent copy of the slot at `at`, or None if writers kept
+        changing it.
+        """
+        for _ in range(_READ_RETRIES):
+            fields = _SLOT.unpack_from(self._mm, at)
+            if fields[0] % 2 == 0 and _SEQ.unpack_from(self._mm, at)[0] == fields[0]:
+                return fields
+        return None
+
+    def _read(self, digest, now):
+        for at in self._bucket(digest):
+            fields = self._read_slot(at)
+            if fields is None or fields[1] != digest or fields[6] <= now:
+                continue
+            _, _, pos, length, _, fresh_until, expires_at = fields
+            offset = self._ring_at + pos % self.ring_size
+            payload = self._mm[offset : offset + length]
+            head = _SEQ.unpack_from(self._mm, _HEAD_AT)[0]
+            # Overwritten while we copied it, or the slot was reused.
+            if head > pos + self.ring_size or self._read_slot(at) != fields:
+                continue
+            return payload, fresh_until - now, expires_at - now
+        return None
+
+    def get(self, *keys):
+        """
+        (serialized value, seconds fresh, seconds left) for the first of
+        `keys` held and unexpired, or None. The seconds fresh are negative
+        for a stale value.
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        for key in keys:
+            found = self._read(_digest(key), now)
+            if found is not None:
+                lookup_counter.add(1, {"result": "hit"})
+                return found
+        lookup_counter.add(1, {"result": "miss"})
+        return None
+
+    def fresh_for(self, key):
+        """
+        Seconds `key` stays fresh, 0 once stale, None if not held; reads
+        the slot only, not the value.
+        """
+        if not self.enabled:
+            return None
+        digest = _digest(key)
+        now = time.time()
+        head = _SEQ.unpack_from(self._mm, _HEAD_AT)[0]
+        for at in self._bucket(digest):
+            fields = self._read_slot(at)
+            if fields is None or fields[1] != digest or fields[6] <= now:
+                continue
+            if head > fields[2] + self.ring_size:
+                continue
+            return max(0.0, fields[5] - now)
+        return None
+
+    def _write_slot(self, at, *fields):
+        seq = _SEQ.unpack_from(self._mm, at)[0] | 1
+        _SEQ.pack_into(self._mm, at, seq)
+        _SLOT.pack_into(self._mm, at, seq, *fields)
+        _SEQ.pack_into(self._mm, at, seq + 1)
+
+    def put(self, key, payload, ttl, stale_ttl=0):
+        """
+        Stores the serialized `payload` as fresh for `ttl` seconds and stale
+        for `stale_ttl` more.
+        """
+        length = len(payload)
+        if not self.enabled or ttl + stale_ttl <= 0 or length > self.ring_size:
+            return
+        digest = _digest(key)
+        now = time.time()
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                # The key's own slot, else a free or expired one, else the
+                # one closest to expiring.
+                slots = [
+                    (at, _SLOT.unpack_from(self._mm, at))
+                    for at in self._bucket(digest)
+                ]
+                at = next((at for at, f in slots if f[1] == digest), None)
+                if at is None:
+                    at = min(slots, key=lambda item: item[1][6])[0]
+                pos = _SEQ.unpack_from(self._mm, _HEAD_AT)[0]
+                if pos % self.ring_size + length > self.ring_size:
+                    pos += self.ring_size - pos % self.ring_size
+                # Reserve the bytes before writing them, so readers of what
+                # they replace notice.
+                _SEQ.pack_into(self._mm, _HEAD_AT, pos + length)
+                offset = self._ring_at + pos % self.ring_size
+                self._mm[offset : offset + length] = payload
+                self._write_slot(
+                    at,
+                    digest,
+                    pos,
+                    length,
+                    _site_crc(key[0]),
+                    now + ttl,
+                    now + ttl + stale_ttl,
+                )
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        except (OSError, ValueError):
+            error_counter.add(1, {"op": "write"})
+
+    def clear(self, site=None):
+        """
+        Drops every entry, or only those of `site`, and tells the other
+        workers to drop their memory tier. Returns how many went.
+        """
+        if not self.enabled:
+            return 0
+        crc = None if site is None else _site_crc(site)
+        now = time.time()
+        cleared = 0
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            for i in range(self.slots):
+                at = _HEADER_SIZE + i * _SLOT_SIZE
+                fields = _SLOT.unpack_from(self._mm, at)
+                if fields[6] <= now or (crc is not None and fields[4] != crc):
+                    continue
+                self._write_slot(at, bytes(16), 0, 0, 0, 0.0, 0.0)
+                cleared += 1
+            self._generation = self._read_generation() + 1
+            _SEQ.pack_into(self._mm, _GENERATION_AT, self._generation)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return cleared
+
+    def snapshot(self):
+        if not self.enabled:
+            return {"enabled": False}
+        now = time.time()
+        head = _SEQ.unpack_from(self._mm, _HEAD_AT)[0]
+        live = [
+            fields
+            for fields in (
+                _SLOT.unpack_from(self._mm, _HEADER_SIZE + i * _SLOT_SIZE)
+                for i in range(self.slots)
+            )
+            if fields[6] > now and head <= fields[2] + self.ring_size
+        ]
+        return {
+            "enabled": True,
+            "path": self.path,
+            "entries": len(live),
+            "bytes": sum(fields[3] for fields in live),
+            "max_bytes": self.ring_size,
+            "slots": self.slots,
+        }
+
+
+meter = get_meter(__name__)
+lookup_counter = meter.create_counter(
+    "shared_cache_lookups",
+    description="Shared result cache lookups by hit/miss",
+)
+error_counter = meter.create_counter(
+    "shared_cache_errors",
+    description="Failures opening or writing the shared result cache",
+)
+
+shared_cache = SharedCache()
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from opentelemetry.metrics import get_meter
+
+meter = get_meter(__name__)
+wait_histogram = meter.create_histogram(
+    "upstream_singleflight_wait",
+    unit="ms",
+    description="Time each caller spent waiting on a shared upstream fetch",
+)
+
+
+def normalize_url(url):
+    """
+    Canonical form used to coalesce fetches: lower-cased scheme and host,
+    sorted query parameters and no fragment.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, "")
+    )
+
+
+class _Call:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key: the first caller starts the work,
+    later callers await the same task. A caller being cancelled never cancels
+    the shared work unless it was the last one waiting on it.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key, fn):
+        call = self._calls.get(key)
+        role = "follower"
+        if call is None or call.task.cancelled():
+            role = "leader"
+            call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        call.waiters += 1
+        start = time.monotonic()
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is interested any more; drop the upstream request.
+                self._forget(key, call)
+                call.task.cancel()
+            wait_histogram.record(
+                (time.monotonic() - start) * 1000,
+                {"flight": self.name, "role": role},
+            )
@@ -0,0 +1,297 @@
+import asyncio
+import json
+import time
+from helper.is_site_available import all_sites
+from helper.deadline import deadline_scope, clear_deadline, expired_budget
+from helper.circuit_breaker import (
+    get_breaker,
+    CIRCUIT_TRIP_ON_EMPTY,
+    CIRCUIT_TIMEOUT_FLOOR_MS,
+)
+from helper.normalize import normalize
+from helper.cache import (
+    cache_key,
+    encode,
+    result_cache,
+    negative_cache,
+    report,
+    FRESH,
+    STALE,
+    REVALIDATED,
+)
+from helper.shared_cache import shared_cache
+from helper.persistent_cache import persistent_cache
+from helper.enrichment import needs_detail, enrichment_report
+
+OK = "ok"
+EMPTY = "empty"
+BLOCKED = "blocked"
+TIMEOUT = "timeout"
+CIRCUIT_OPEN = "circuit_open"
+# Left out of a response that had enough without it; the scrape carries on
+# into the cache.
+SKIPPED = "skipped"
+
+for _site in all_sites:
+    get_breaker(_site)
+
+# Cache key -> background task refreshing a stale entry, one per key.
+_refreshing = {}
+# Scrapes a response stopped waiting for, kept alive until they finish.
+_detached = set()
+
+
+def classify(resp):
+    if resp is None:
+        return BLOCKED
+    if len(resp["data"]) > 0:
+        return OK
+    return EMPTY
+
+
+def _record(breaker, site_state):
+    if site_state == OK or (site_state == EMPTY and not CIRCUIT_TRIP_ON_EMPTY):
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+
+
+def _timed_out(site, timeout_ms):
+    if timeout_ms and timeout_ms >= CIRCUIT_TIMEOUT_FLOOR_MS:
+        get_breaker(site).record_failure()
+
+
+async def run_site(site, method, *args):
+    """
+    Calls `method` on the site's scraper and returns (status, response),
+    with the rows of a successful response normalized. Successful responses
+    are cached in memory, in the cache shared by the host's workers and in
+    cache.db, looked up in that order; a stale one is served as is while a
+    background task refreshes it. Empty and blocked responses are repeated
+    for a short while without scraping or touching the circuit breaker.
+    Sites with an open circuit are skipped without touching the network.
+    """
+    scraper = all_sites[site]["website"]()
+    lazy = hasattr(scraper, "_DETAIL_FIELDS") and not needs_detail(
+        scraper._DETAIL_FIELDS
+    )
+    key = cache_key(site, method, args, lazy)
+    if shared_cache.flushed_elsewhere():
+        # Whatever memory holds may be what another worker just flushed.
+        result_cache.clear()
+        negative_cache.clear()
+    if key is not None:
+        # A full result also answers a request that skips detail pages.
+        keys = (key[:-1] + (False,), key) if lazy else (key,)
+        hit = result_cache.get(*keys)
+        if hit is None:
+            hit = await _load(key, keys)
+        if hit is not None:
+            resp, fresh = hit
+            if not fresh:
+                _revalidate(site, method, args, key)
+            report(FRESH if fresh else STALE)
+            return OK, resp
+        negative = negative_cache.get(*keys)
+        if negative is not None:
+            return negative
+    site_state, resp = await _scrape(site, method, args, scraper, key)
+    if key is not None and site_state == OK:
+        report(REVALIDATED)
+    return site_state, resp
+
+
+async def _load(key, keys):
+    """
+    (value, fresh) from the first tier below memory holding one of `keys`,
+    copied into the tiers above it; None if none does.
+    """
+    shared = shared_cache.get(*keys)
+    if shared is not None:
+        payload, ttl, left = shared
+        resp = json.loads(payload)
+        result_cache.put(key, resp, ttl, left - ttl, size=len(payload))
+        return resp, ttl > 0
+    stored = await persistent_cache.get(*keys)
+    if stored is None:
+        return None
+    resp, age, left = stored
+    ttl = result_cache.ttl_for(key) - age
+    payload = encode(resp)
+    result_cache.put(key, resp, ttl, left - ttl, size=len(payload))
+    shared_cache.put(key, payload, ttl, left - ttl)
+    return resp, ttl > 0
+
+
+def _store(key, resp):
+    ttl = result_cache.ttl_for(key)
+    stale_ttl = result_cache.stale_ttl_for(key)
+    payload = encode(resp)
+    result_cache.put(key, resp, ttl, stale_ttl, size=len(payload))
+    shared_cache.put(key, payload, ttl, stale_ttl)
+    persistent_cache.put(key, resp, ttl + stale_ttl)
+    negative_cache.discard(key)
+
+
+async def _scrape(site, method, args, scraper, key):
+    breaker = get_breaker(site)
+    if not breaker.allow():
+        return CIRCUIT_OPEN, None
+    try:
+        with enrichment_report() as cut_short:
+            resp = await getattr(scraper, method)(*args)
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    except Exception:
+        resp = None
+    site_state = classify(resp)
+    budget_ms = expired_budget()
+    if site_state == BLOCKED and budget_ms is not None:
+        # The caller's budget ran out, which says little about the site.
+        breaker.release()
+        _timed_out(site, budget_ms)
+        return TIMEOUT, None
+    if site_state == OK:
+        normalize(resp["data"], getattr(scraper, "_DATE_FORMATS", ()))
+        # Rows the deadline left without detail fields aren't worth keeping.
+        if key is not None and not cut_short:
+            _store(key, resp)
+    elif key is not None:
+        negative_cache.put(key, site_state, resp)
+    _record(breaker, site_state)
+    return site_state, resp
+
+
+def _revalidate(site, method, args, key):
+    """
+    Starts refreshing `key` in the background unless that's already under
+    way, and returns the task; its result is the scrape's status. The
+    refresh isn't bound by the budget of the request that found the entry
+    stale, and a failed one leaves the stale entry in place.
+    """
+    if key in _refreshing:
+        return _refreshing[key]
+
+    async def refresh():
+        clear_deadline()
+        try:
+            site_state, _ = await _scrape(
+                site, method, args, all_sites[site]["website"](), key
+            )
+        except Exception:
+            site_state = BLOCKED
+        return site_state
+
+    task = asyncio.ensure_future(refresh())
+    _refreshing[key] = task
+    task.add_done_callback(lambda _: _refreshing.pop(key, None))
+    return task
+
+
+def refresh_site(site, method, *args):
+    """
+    Scrapes a cached call in the background straight into the cache, fresh
+    or not. Returns the task doing it, shared with any refresh of the same
+    call already running.
+    """
+    return _revalidate(site, method, args, cache_key(site, method, args))
+
+
+async def run_sites(calls, timeout_ms=None):
+    """
+    Runs {site: (method, args)} concurrently under a shared `timeout_ms`
+    budget. Returns {site: (status, response)} in the order of `calls`;
+    sites still running when the budget expires are cancelled and reported
+    as timeout, counting against their circuit breaker only when the budget
+    was at least CIRCUIT_TIMEOUT_FLOOR_MS.
+    """
+    with deadline_scope(timeout_ms):
+        tasks = {
+            asyncio.create_task(run_site(site, method, *args)): site
+            for site, (method, args) in calls.items()
+        }
+    if not tasks:
+        return {}
+    done, pending = await asyncio.wait(
+        tasks, timeout=timeout_ms / 1000 if timeout_ms else None
+    )
+    results = {}
+    for task in pending:
+        _timed_out(tasks[task], timeout_ms)
+        task.cancel()
+        results[tasks[task]] = (TIMEOUT, None)
+    for task in done:
+        results[tasks[task]] = task.result()
+    return {site: results[site] for site in calls}
+
+
+def _detach(tasks, deadline, timeout_ms):
+    """
+    Lets {task: site} still running finish into the cache after their
+    caller has moved on. Whatever is still running at the monotonic
+    `deadline` is cancelled as a timeout, like in run_sites.
+    """
+    loop = asyncio.get_event_loop()
+
+    def expire(task, site):
+        if not task.done():
+            _timed_out(site, timeout_ms)
+            task.cancel()
+
+    for task, site in tasks.items():
+        _detached.add(task)
+        task.add_done_callback(_detached.discard)
+        if deadline is not None:
+            handle = loop.call_later(
+                max(0.0, deadline - time.monotonic()), expire, task, site
+            )
+            task.add_done_callback(lambda _, handle=handle: handle.cancel())
+
+
+async def stream_sites(calls, timeout_ms=None, detach=False):
+    """
+    Same as run_sites, but yields (site, status, response, seconds) as soon
+    as each site finishes instead of waiting for the slowest one. Sites
+    still running when the budget expires are yielded last as timeout.
+    Closing the generator early cancels whatever is still running, or with
+    `detach` leaves it to finish into the cache within the budget.
+    """
+    start = time.monotonic()
+
+    async def timed(site, method, args):
+        site_state, resp = await run_site(site, method, *args)
+        return site, site_state, resp, time.monotonic() - start
+
+    with deadline_scope(timeout_ms):
+        tasks = {
+            asyncio.create_task(timed(site, method, args)): site
+            for site, (method, args) in calls.items()
+        }
+    pending = set(tasks)
+    deadline = start + timeout_ms / 1000 if timeout_ms else None
+    try:
+        while pending:
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                yield task.result()
+        expired = [t for t in tasks if t in pending]
+        pending = set()
+        for task in expired:
+            _timed_out(tasks[task], timeout_ms)
+            task.cancel()
+        for task in expired:
+            yield tasks[task], TIMEOUT, None, time.monotonic() - start
+    finally:
+        if detach:
+            _detach({t: tasks[t] for t in pending}, deadline, timeout_ms)
+        else:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,96 @@
+import codecs
+import os
+from html.parser import HTMLParser
+from .parser import Extract
+
+# Bytes read from the socket per step while scanning a listing for rows.
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", 16 * 1024))
+
+
+class Rows:
+    """
+    How much of a listing page a parser needs: the first `count` elements
+    matching `rule` (any Extract rule), counting header rows too.
+    """
+
+    def __init__(self, rule, count):
+        self.rule = rule
+        self.count = count
+        self.match = Extract(rule)
+
+    @property
+    def key(self):
+        return "rows={!r}x{}".format(self.rule, self.count)
+
+
+class _RowScanner(HTMLParser):
+    """
+    Tokenizes the page as it arrives and remembers where the last needed
+    row closed, without building a tree.
+    """
+
+    def __init__(self, rows):
+        super().__init__(convert_charrefs=False)
+        self.rows = rows
+        self.chunks = []
+        self.size = 0
+        self.line_starts = [0]
+        self.open_tag = None
+        self.depth = 0
+        self.closed = 0
+        self.end = None
+
+    def push(self, text):
+        self.chunks.append(text)
+        pos = text.find("\n")
+        while pos != -1:
+            self.line_starts.append(self.size + pos + 1)
+            pos = text.find("\n", pos + 1)
+        self.size += len(text)
+        self.feed(text)
+
+    def handle_starttag(self, tag, attrs):
+        if self.open_tag is None:
+            if self.rows.match.wants(tag, dict(attrs)):
+                self.open_tag, self.depth = tag, 1
+        elif tag == self.open_tag:
+            self.depth += 1
+
+    def handle_endtag(self, tag):
+        if tag != self.open_tag:
+            return
+        self.depth -= 1
+        if self.depth > 0:
+            return
+        self.open_tag = None
+        self.closed += 1
+        if self.closed == self.rows.count and self.end is None:
+            line, col = self.getpos()
+            self.end = self.line_starts[line - 1] + col
+
+    def text(self):
+        text = "".join(self.chunks)
+        if self.end is None:
+            return text
+        return text[: text.index(">", self.end) + 1]
+
+
+async def read_rows(response, rows):
+    """
+    Reads an aiohttp response only until `rows` are complete and returns the
+    markup up to the end of the last one (or the whole page if it has fewer
+    rows). On early exit the connection is dropped instead of drained.
+    """
+    charset = response.charset or "utf-8"
+    try:
+        decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    scanner = _RowScanner(rows)
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        scanner.push(decoder.decode(chunk))
+        if scanner.end is not None:
+            response.close()
+            return scanner.text()
+    scanner.push(decoder.decode(b"", final=True))
+    return scanner.text()
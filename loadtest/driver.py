@@ -0,0 +1,141 @@
+"""
+Closed-loop load driver for the API, meant to run against the replay server.
+
+    python -m loadtest.driver --concurrency 32 --requests 500 \
+        --path "/api/v1/all/search?query={query}&limit=10"
+
+Every worker sends its next request as soon as the previous one answers.
+The report gives throughput, latency percentiles, HTTP status counts and,
+for combo endpoints, how often each site came back ok/empty/blocked/timeout.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import time
+from collections import Counter
+
+import aiohttp
+
+DEFAULT_QUERIES = ["avengers", "ubuntu", "one piece", "interstellar", "flac"]
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.site_statuses = Counter()
+        self.errors = Counter()
+
+    def add(self, latency, status, body):
+        self.latencies.append(latency)
+        self.statuses[status] += 1
+        if isinstance(body, dict) and isinstance(body.get("status"), dict):
+            for site, state in body["status"].items():
+                self.site_statuses["{}:{}".format(site, state)] += 1
+
+
+async def _one(session, url, stats):
+    start = time.perf_counter()
+    try:
+        async with session.get(url) as r:
+            raw = await r.read()
+            status = r.status
+    except Exception as e:
+        stats.errors[type(e).__name__] += 1
+        return
+    latency = (time.perf_counter() - start) * 1000
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        body = None
+    stats.add(latency, status, body)
+
+
+async def run(base, path, queries, concurrency, requests, warmup, timeout):
+    urls = itertools.cycle(
+        base.rstrip("/") + path.format(query=q.replace(" ", "%20")) for q in queries
+    )
+    session_timeout = aiohttp.ClientTimeout(total=timeout)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(
+        timeout=session_timeout, connector=connector
+    ) as session:
+        ignored = Stats()
+        await asyncio.gather(*[_one(session, next(urls), ignored) for _ in range(warmup)])
+
+        stats = Stats()
+        remaining = itertools.count()
+
+        async def worker():
+            while next(remaining) < requests:
+                await _one(session, next(urls), stats)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return stats, elapsed
+
+
+def report(stats, elapsed):
+    latencies = sorted(stats.latencies)
+    done = len(latencies)
+    lines = [
+        "requests   {:>9}".format(done + sum(stats.errors.values())),
+        "completed  {:>9}".format(done),
+        "elapsed    {:>9.2f} s".format(elapsed),
+        "throughput {:>9.2f} req/s".format(done / elapsed if elapsed else 0),
+        "latency    p50 {:.1f} ms  p95 {:.1f} ms  p99 {:.1f} ms  max {:.1f} ms".format(
+            percentile(latencies, 50),
+            percentile(latencies, 95),
+            percentile(latencies, 99),
+            latencies[-1] if latencies else 0.0,
+        ),
+        "http       " + "  ".join(
+            "{}={}".format(k, v) for k, v in sorted(stats.statuses.items())
+        ),
+    ]
+    if stats.errors:
+        lines.append(
+            "errors     " + "  ".join(
+                "{}={}".format(k, v) for k, v in sorted(stats.errors.items())
+            )
+        )
+    for key, count in sorted(stats.site_statuses.items()):
+        lines.append("site       {:<32} {:>7}".format(key, count))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load driver for the API")
+    ap.add_argument("--url", default="http://127.0.0.1:8009")
+    ap.add_argument("--path", default="/api/v1/all/search?query={query}&limit=10")
+    ap.add_argument("--query", action="append", help="queries to rotate through")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--warmup", type=int, default=10)
+    ap.add_argument("--timeout", type=float, default=60, help="per request, seconds")
+    args = ap.parse_args(argv)
+
+    stats, elapsed = asyncio.run(
+        run(
+            args.url, args.path, args.query or DEFAULT_QUERIES, args.concurrency,
+            args.requests, args.warmup, args.timeout,
+        )
+    )
+    print(report(stats, elapsed))
+
+
+if __name__ == "__main__":
+    main()
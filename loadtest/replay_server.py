@@ -0,0 +1,307 @@
+"""
+Local stand-in for every upstream site, for reproducible end-to-end load tests.
+
+    python -m loadtest.replay_server --port 8090 --latency 150 --jitter 100
+    UPSTREAM_BASE_URL=http://127.0.0.1:8090 python main.py
+
+Each site is served under /<original host>/..., which is exactly where
+constants/base_url.py points once UPSTREAM_BASE_URL is set. Responses come
+from recordings (see --record) and, for anything not recorded, from the
+benchmark fixtures: a site's listing page answers its search URLs and its
+detail page answers torrent URLs shaped like the first listed row.
+
+Do not set UPSTREAM_BASE_URL for the server process itself.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.cases import CASES
+from constants import base_url
+from constants.headers import HEADER_AIO
+
+RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+HTTP_PROXY = os.environ.get("HTTP_PROXY", None)
+CHUNK = 4096
+
+# Hosts of every BASE_URL; base URLs carry no path, so the last segment is
+# the host whether or not UPSTREAM_BASE_URL is set.
+HOSTS = sorted(
+    value.rsplit("/", 1)[-1]
+    for name, value in vars(base_url).items()
+    if name.isupper() and name != "UPSTREAM_BASE_URL" and isinstance(value, str)
+)
+
+
+def _shape(segment):
+    return re.sub(r"\d+", "#", segment)
+
+
+def _first_segment(path):
+    return _shape(path.strip("/").split("/")[0])
+
+
+def _extension(path):
+    return os.path.splitext(path.rstrip("/"))[1]
+
+
+class Recording:
+    def __init__(
+        self, host, path, query, body, status=200,
+        content_type="text/html; charset=utf-8",
+    ):
+        self.host = host
+        self.path = path
+        self.query = query
+        self.body = body
+        self.status = status
+        self.content_type = content_type
+
+    def score(self, path, query):
+        """
+        How well this recording stands in for a request; higher wins.
+        Falls back from an exact match to the same path, the same first
+        path segment (digits ignored) and the same file extension.
+        """
+        return (
+            self.path == path and self.query == query,
+            self.path == path,
+            _first_segment(self.path) == _first_segment(path),
+            _extension(self.path) == _extension(path),
+        )
+
+
+class Store:
+    """
+    Recordings by host, looked up by best score. Earlier entries win ties,
+    so real recordings are added before the fixture-derived ones.
+    """
+
+    def __init__(self, root=RECORDINGS):
+        self.root = root
+        self.by_host = {}
+
+    def add(self, recording):
+        self.by_host.setdefault(recording.host, []).append(recording)
+
+    def find(self, host, path, query):
+        candidates = self.by_host.get(host)
+        if not candidates:
+            return None
+        return max(candidates, key=lambda r: r.score(path, query))
+
+    def _index_path(self):
+        return os.path.join(self.root, "index.json")
+
+    def load(self):
+        if not os.path.exists(self._index_path()):
+            return 0
+        with open(self._index_path()) as f:
+            index = json.load(f)
+        for entry in index:
+            with open(os.path.join(self.root, entry["body"]), "rb") as f:
+                body = f.read()
+            self.add(
+                Recording(
+                    entry["host"], entry["path"], entry["query"], body,
+                    entry["status"], entry["content_type"],
+                )
+            )
+        return len(index)
+
+    def save(self, recording):
+        """
+        Adds a freshly recorded response and persists it next to the index.
+        """
+        index = []
+        if os.path.exists(self._index_path()):
+            with open(self._index_path()) as f:
+                index = json.load(f)
+        os.makedirs(os.path.join(self.root, recording.host), exist_ok=True)
+        name = os.path.join(recording.host, "{}.html".format(len(index)))
+        with open(os.path.join(self.root, name), "wb") as f:
+            f.write(recording.body)
+        index.append(
+            {
+                "host": recording.host,
+                "path": recording.path,
+                "query": recording.query,
+                "status": recording.status,
+                "content_type": recording.content_type,
+                "body": name,
+            }
+        )
+        with open(self._index_path(), "w") as f:
+            json.dump(index, f, indent=2)
+        self.by_host.setdefault(recording.host, []).insert(0, recording)
+
+
+async def _first_search_url(instance):
+    """
+    Runs the scraper's search() against a fake fetch and returns the first
+    URL it asked for, so fixtures are filed under the real URL shape.
+    """
+    from helper import cloudflare, html_scraper
+
+    seen = []
+
+    async def capture(*args, **kwargs):
+        seen.append(next(a for a in args if isinstance(a, str)))
+        return None
+
+    original = html_scraper.Scraper._get_html, cloudflare.get_html
+    html_scraper.Scraper._get_html = capture
+    cloudflare.get_html = capture
+    try:
+        await instance.search("q", 1, 5)
+    except Exception:
+        pass
+    finally:
+        html_scraper.Scraper._get_html, cloudflare.get_html = original
+    return seen[0] if seen else None
+
+
+def _first_row_url(case, instance):
+    result = getattr(instance, case.method)([case.load()], *case.args)
+    if isinstance(result, tuple):
+        result = result[0]
+    return result["data"][0]["url"]
+
+
+def _recording_for(url, body):
+    parts = urlsplit(url)
+    return Recording(parts.netloc, parts.path or "/", parts.query, body)
+
+
+def seed_from_fixtures(store):
+    loop = asyncio.new_event_loop()
+    try:
+        listings = {}
+        for case in CASES:
+            _, instance = case.scraper()
+            if case.page == "listing":
+                listings[case.site] = (case, instance)
+                url = loop.run_until_complete(_first_search_url(instance))
+                if url is None:
+                    url = instance.BASE_URL + "/"
+            else:
+                listing, listing_instance = listings[case.site]
+                url = _first_row_url(listing, listing_instance)
+            store.add(_recording_for(url, case.load()))
+    finally:
+        loop.close()
+
+
+class Faults:
+    def __init__(self, latency=0, jitter=0, error_rate=0.0, bandwidth=0, seed=None):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        # KiB/s per response; 0 means unlimited.
+        self.bandwidth = bandwidth * 1024
+        self.random = random.Random(seed)
+
+    def delay(self):
+        return self.latency + self.random.uniform(0, self.jitter)
+
+    def fails(self):
+        return self.random.random() < self.error_rate
+
+
+def _rewrite_links(body, public_base):
+    # Absolute links to any site must come back through the replay server.
+    for host in HOSTS:
+        for scheme in (b"https://", b"http://"):
+            body = body.replace(
+                scheme + host.encode(), "{}/{}".format(public_base, host).encode()
+            )
+    return body
+
+
+async def _record(store, host, path, query):
+    url = "https://{}{}".format(host, path) + ("?" + query if query else "")
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, headers=HEADER_AIO, proxy=HTTP_PROXY) as r:
+            recording = Recording(
+                host, path, query, await r.read(), r.status,
+                r.headers.get("Content-Type", "text/html"),
+            )
+    store.save(recording)
+    return recording
+
+
+def make_app(store, faults, record=False):
+    async def handle(request):
+        host = request.match_info["host"]
+        path = "/" + request.match_info["tail"]
+        query = request.query_string
+        await asyncio.sleep(faults.delay())
+        if faults.fails():
+            return web.Response(status=503, text="Service Unavailable")
+        if record:
+            recording = await _record(store, host, path, query)
+        else:
+            recording = store.find(host, path, query)
+        if recording is None:
+            return web.Response(status=404, text="No recording for " + host)
+
+        body = _rewrite_links(
+            recording.body, "{}://{}".format(request.scheme, request.host)
+        )
+        response = web.StreamResponse(
+            status=recording.status,
+            headers={"Content-Type": recording.content_type},
+        )
+        response.content_length = len(body)
+        await response.prepare(request)
+        if not faults.bandwidth:
+            await response.write(body)
+        else:
+            for i in range(0, len(body), CHUNK):
+                await response.write(body[i : i + CHUNK])
+                await asyncio.sleep(CHUNK / faults.bandwidth)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{host}/{tail:.*}", handle)
+    return app
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay server for upstream sites")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--latency", type=float, default=0, help="base delay, ms")
+    ap.add_argument("--jitter", type=float, default=0, help="extra random delay, ms")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503s")
+    ap.add_argument("--bandwidth", type=float, default=0, help="KiB/s per response")
+    ap.add_argument("--seed", type=int, default=None, help="RNG seed for faults")
+    ap.add_argument("--recordings", default=RECORDINGS)
+    ap.add_argument(
+        "--record", action="store_true",
+        help="proxy to the real sites and save every response",
+    )
+    args = ap.parse_args(argv)
+
+    store = Store(args.recordings)
+    recorded = store.load()
+    seed_from_fixtures(store)
+    print("{} recordings, fixtures for {} hosts".format(recorded, len(store.by_host)))
+    faults = Faults(
+        args.latency, args.jitter, args.error_rate, args.bandwidth, args.seed
+    )
+    web.run_app(
+        make_app(store, faults, args.record), host=args.host, port=args.port
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,19 @@ from routers.v1.combo_routers import router as combo_router
 from routers.v1.sites_list_router import router as site_list_router
 from routers.home_router import router as home_router
 from routers.v1.search_url_router import router as search_url_router
+from routers.v1.enrich_router import router as enrich_router
+from routers.v1.cache_router import router as cache_router
 from helper.uptime import getUptime
+from helper.http_client import start_session, close_session
+from helper import cloudflare
+from helper import parse_pool
+from helper.shared_cache import shared_cache
+from helper.persistent_cache import persistent_cache
+from helper.prewarm import prewarmer
 from mangum import Mangum
 from math import ceil
 import time
+from contextlib import asynccontextmanager
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -35,7 +44,10 @@ otlp_exporter = OTLPSpanExporter(endpoint="tempo-collector:4317", insecure=True)
 span_processor = BatchSpanProcessor(otlp_exporter)
 tracer_provider.add_span_processor(span_processor)
 
-start_http_server(port=8000, addr="0.0.0.0")
+# Parse pool workers re-import this module as __mp_main__ and must not try
+# to bind the metrics port a second time.
+if __name__ != "__mp_main__":
+    start_http_server(port=8000, addr="0.0.0.0")
 prometheus_reader = PrometheusMetricReader()
 meter_provider = MeterProvider(resource=resource, metric_readers=[prometheus_reader])
 
@@ -44,6 +56,23 @@ def init_telemetry(app):
 
 startTime = time.time()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_session()
+    await parse_pool.start_pool()
+    shared_cache.start()
+    await persistent_cache.start()
+    prewarmer.start()
+    yield
+    await prewarmer.stop()
+    await persistent_cache.stop()
+    shared_cache.stop()
+    await close_session()
+    cloudflare.shutdown()
+    parse_pool.stop_pool()
+
+
 app = FastAPI(
     title="Torrent-Api-Py",
     version="1.0.1",
@@ -54,6 +83,7 @@ app = FastAPI(
         "url": "https://github.com/ryuk-me",
         "email": "neerajkr1210@gmail.com",
     },
+    lifespan=lifespan,
 )
 
 init_telemetry(app)
@@ -89,6 +119,8 @@ app.include_router(recent_router, prefix="/api/v1/recent")
 app.include_router(combo_router, prefix="/api/v1/all")
 app.include_router(site_list_router, prefix="/api/v1/sites")
 app.include_router(search_url_router, prefix="/api/v1/search_url")
+app.include_router(enrich_router, prefix="/api/v1/enrich")
+app.include_router(cache_router, prefix="/api/v1/cache")
 app.include_router(home_router, prefix="")
 
 handler = Mangum(app)
@@ -0,0 +1,86 @@
+import hmac
+import os
+from fastapi import APIRouter, Header, status
+from typing import Optional
+from helper.cache import result_cache, negative_cache
+from helper.shared_cache import shared_cache
+from helper.persistent_cache import persistent_cache
+from helper.error_messages import error_handler
+from opentelemetry import trace
+from opentelemetry.metrics import get_meter
+
+# The cache admin routes require it in the X-Admin-Token header; while it
+# is unset they refuse every request.
+CACHE_ADMIN_TOKEN = os.environ.get("CACHE_ADMIN_TOKEN", None)
+
+tracer = trace.get_tracer(__name__)
+meter = get_meter(__name__)
+request_counter = meter.create_counter(
+    "cache_admin_requests",
+    description="Number of cache admin requests",
+)
+
+router = APIRouter(tags=["Cache"])
+
+
+def _forbidden(token):
+    if CACHE_ADMIN_TOKEN and token is not None and hmac.compare_digest(
+        token.encode(), CACHE_ADMIN_TOKEN.encode()
+    ):
+        return None
+    request_counter.add(1, {"status": "forbidden"})
+    return error_handler(
+        status_code=status.HTTP_403_FORBIDDEN,
+        json_message={
+            "error": "Invalid admin token."
+            if CACHE_ADMIN_TOKEN
+            else "Cache admin is disabled, set CACHE_ADMIN_TOKEN to enable it."
+        },
+    )
+
+
+@router.get("/")
+@router.get("")
+async def get_cache_stats(x_admin_token: Optional[str] = Header(None)):
+    with tracer.start_as_current_span("get_cache_stats"):
+        request_counter.add(1, {"status": "requested"})
+        forbidden = _forbidden(x_admin_token)
+        if forbidden is not None:
+            return forbidden
+        request_counter.add(1, {"status": "success"})
+        return error_handler(
+            status_code=status.HTTP_200_OK,
+            json_message=dict(
+                result_cache.snapshot(),
+                shared=shared_cache.snapshot(),
+                negative=negative_cache.snapshot(),
+            ),
+        )
+
+
+@router.delete("/")
+@router.delete("")
+async def flush_cache(
+    site: Optional[str] = None, x_admin_token: Optional[str] = Header(None)
+):
+    with tracer.start_as_current_span("flush_cache") as span:
+        span.set_attribute("site", site or "")
+        request_counter.add(1, {"status": "requested"})
+        forbidden = _forbidden(x_admin_token)
+        if forbidden is not None:
+            return forbidden
+        site = site.lower() if site else None
+        flushed = result_cache.clear(site)
+        shared = shared_cache.clear(site)
+        negative = negative_cache.clear(site)
+        persisted = await persistent_cache.clear(site)
+        request_counter.add(1, {"status": "success"})
+        return error_handler(
+            status_code=status.HTTP_200_OK,
+            json_message={
+                "flushed": flushed,
+                "shared_flushed": shared,
+                "negative_flushed": negative,
+                "persisted_flushed": persisted,
+            },
+        )
@@ -3,6 +3,8 @@ from fastapi import status
 from typing import Optional
 from helper.is_site_available import check_if_site_available
 from helper.error_messages import error_handler
+from helper.site_runner import run_site, CIRCUIT_OPEN
+from helper.enrichment import parse_fields, fields_scope, project
 from opentelemetry import trace
 from opentelemetry.metrics import get_meter
 
@@ -28,6 +30,7 @@ async def get_category(
     category: str,
     limit: Optional[int] = 0,
     page: Optional[int] = 1,
+    fields: Optional[str] = None,
 ):
     with tracer.start_as_current_span("get_category") as span:
         span.set_attribute("site", site)
@@ -39,6 +42,7 @@ async def get_category(
         request_counter.add(1, {"site": site, "status": "requested"})
 
         site = site.lower()
+        fields = parse_fields(fields)
         query = query.lower()
         category = category.lower()
         all_sites = check_if_site_available(site)
@@ -60,9 +64,17 @@ async def get_category(
                             "available_categories": all_sites[site]["categories"],
                         },
                     )
-                resp = await all_sites[site]["website"]().search_by_category(
-                    query, category, page, limit
-                )
+                with fields_scope(fields):
+                    site_state, resp = await run_site(
+                        site, "search_by_category", query, category, page, limit
+                    )
+                if site_state == CIRCUIT_OPEN:
+                    span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Circuit Open"))
+                    request_counter.add(1, {"site": site, "status": "circuit_open"})
+                    return error_handler(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        json_message={"error": "Website temporarily unavailable, retry later."},
+                    )
                 if resp is None:
                     span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Site Blocked"))
                     request_counter.add(1, {"site": site, "status": "blocked"})
@@ -74,7 +86,7 @@ async def get_category(
                     )
                 elif len(resp["data"]) > 0:
                     request_counter.add(1, {"site": site, "status": "success"})
-                    return resp
+                    return project(resp, fields)
                 else:
                     span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Result not found"))
                     request_counter.add(1, {"site": site, "status": "empty"})
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, status
+import json
+import os
+from fastapi import APIRouter, Response, status
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from helper.is_site_available import check_if_site_available
+from helper.site_runner import run_sites, stream_sites, OK, SKIPPED
 import time
-import asyncio
 from helper.error_messages import error_handler
+from helper.merge import merge_by_infohash
+from helper.cache import cache_states, x_cache
+from helper.ranking import SORT_FIELDS, sort_key, top_k, run_sites_ranked
 from opentelemetry import trace
 from opentelemetry.metrics import get_meter
 
@@ -18,61 +24,254 @@ empty_result_counter = meter.create_counter(
     description="Number of empty combo results",
 )
 
+# Default budget for a whole combo request when the caller doesn't pass one.
+COMBO_TIMEOUT_MS = int(os.environ.get("COMBO_TIMEOUT_MS", 15000))
+# Range a caller's timeout_ms must fall in.
+COMBO_TIMEOUT_MIN_MS = 500
+COMBO_TIMEOUT_MAX_MS = 60000
+# Formats of /search/stream.
+_STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
 router = APIRouter(tags=["Combo Routes"])
 
 
+def _combine(span, results, start_time, merge=True, limit=0, sort=None):
+    COMBO = {"data": []}
+    total_torrents_overall = 0
+    site_status = {}
+    for site, (site_state, res) in results.items():
+        site_status[site] = site_state
+        if site_state == OK:
+            for torrent in res["data"]:
+                COMBO["data"].append(torrent)
+            total_torrents_overall = total_torrents_overall + res["total"]
+        else:
+            empty_result_counter.add(1, {"site": site, "status": site_state})
+    if merge and total_torrents_overall:
+        COMBO["data"] = merge_by_infohash(
+            (site, res["data"])
+            for site, (site_state, res) in results.items()
+            if site_state == OK
+        )
+    if sort:
+        COMBO["data"] = top_k(COMBO["data"], limit, sort_key(sort))
+    elif limit:
+        COMBO["data"] = COMBO["data"][:limit]
+    total_torrents_overall = len(COMBO["data"])
+    COMBO["time"] = time.time() - start_time
+    COMBO["total"] = total_torrents_overall
+    COMBO["status"] = site_status
+    if total_torrents_overall == 0:
+        span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Result not found"))
+        request_counter.add(1, {"status": "empty"})
+        return error_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            json_message={"error": "Result not found.", "status": site_status},
+        )
+    request_counter.add(1, {"status": "success"})
+    return COMBO
+
+
+def _site_calls(sites_list, method, args, limit):
+    """
+    {site: (method, args + (limit,))}, each site asked for at most `limit`
+    rows and never more than its own cap.
+    """
+    all_sites = check_if_site_available("1337x")
+    calls = {}
+    for site in sites_list:
+        site_limit = (
+            all_sites[site]["limit"]
+            if limit == 0 or limit > all_sites[site]["limit"]
+            else limit
+        )
+        calls[site] = (method, args + (site_limit,))
+    return calls
+
+
+def _search_calls(query, limit):
+    all_sites = check_if_site_available("1337x")
+    return _site_calls(list(all_sites.keys()), "search", (query, 1), limit)
+
+
+def _sort_error(sort):
+    if sort is None or sort in SORT_FIELDS:
+        return None
+    return error_handler(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        json_message={
+            "error": "sort must be one of {}.".format(", ".join(SORT_FIELDS))
+        },
+    )
+
+
+def _timeout_error(timeout_ms):
+    if timeout_ms is None:
+        return None
+    if COMBO_TIMEOUT_MIN_MS <= timeout_ms <= COMBO_TIMEOUT_MAX_MS:
+        return None
+    return error_handler(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        json_message={
+            "error": "timeout_ms must be between {} and {}.".format(
+                COMBO_TIMEOUT_MIN_MS, COMBO_TIMEOUT_MAX_MS
+            )
+        },
+    )
+
+
+async def _run_combo(
+    span, calls, start_time, limit, sort, merge, timeout_ms, grace_ms, response=None
+):
+    timeout_ms = timeout_ms or COMBO_TIMEOUT_MS
+    with cache_states() as states:
+        if sort and limit:
+            results = await run_sites_ranked(calls, timeout_ms, limit, grace_ms)
+        else:
+            results = await run_sites(calls, timeout_ms)
+    if response is not None:
+        response.headers["X-Cache"] = x_cache(states)
+    return _combine(span, results, start_time, merge, limit, sort)
+
+
+def _frame(format, event, payload):
+    if format == "sse":
+        return "event: {}\ndata: {}\n\n".format(event, json.dumps(payload))
+    return json.dumps(dict(payload, type=event)) + "\n"
+
+
+async def _stream(calls, timeout_ms, format, start_time, limit=0):
+    """
+    Frames per-site results as they arrive. With a `limit`, stops once that
+    many rows went out; sites still running then are reported as skipped
+    and left to finish into the cache.
+    """
+    site_status = {}
+    timings = {}
+    total_torrents_overall = 0
+    stream = stream_sites(calls, timeout_ms, detach=True)
+    try:
+        async for site, site_state, res, seconds in stream:
+            site_status[site] = site_state
+            timings[site] = seconds
+            if site_state != OK:
+                empty_result_counter.add(1, {"site": site, "status": site_state})
+                continue
+            data = res["data"]
+            if limit:
+                data = data[: limit - total_torrents_overall]
+            total_torrents_overall = total_torrents_overall + len(data)
+            yield _frame(
+                format,
+                "results",
+                {"site": site, "data": data, "total": len(data), "time": seconds},
+            )
+            if limit and total_torrents_overall >= limit:
+                break
+    finally:
+        await stream.aclose()
+    site_status = {site: site_status.get(site, SKIPPED) for site in calls}
+    request_counter.add(
+        1, {"status": "success" if total_torrents_overall else "empty"}
+    )
+    yield _frame(
+        format,
+        "summary",
+        {
+            "time": time.time() - start_time,
+            "total": total_torrents_overall,
+            "status": site_status,
+            "timings": timings,
+        },
+    )
+
+
 @router.get("/search")
-async def get_search_combo(query: str, limit: Optional[int] = 0):
+async def get_search_combo(
+    query: str,
+    limit: Optional[int] = 0,
+    timeout_ms: Optional[int] = None,
+    merge: Optional[bool] = True,
+    sort: Optional[str] = None,
+    grace_ms: Optional[int] = None,
+):
     with tracer.start_as_current_span("get_search_combo") as span:
         span.set_attribute("query", query)
         span.set_attribute("limit", limit)
+        span.set_attribute("sort", sort or "")
 
+        error = _sort_error(sort) or _timeout_error(timeout_ms)
+        if error is not None:
+            return error
         request_counter.add(1, {"status": "requested"})
 
         start_time = time.time()
-        query = query.lower()
-        all_sites = check_if_site_available("1337x")
-        sites_list = list(all_sites.keys())
-        tasks = []
-        COMBO = {"data": []}
-        total_torrents_overall = 0
-        for site in sites_list:
-            limit = (
-                all_sites[site]["limit"]
-                if limit == 0 or limit > all_sites[site]["limit"]
-                else limit
-            )
-            tasks.append(
-                asyncio.create_task(
-                    all_sites[site]["website"]().search(query, page=1, limit=limit)
-                )
-            )
-        results = await asyncio.gather(*tasks)
-        for res in results:
-            if res is not None and len(res["data"]) > 0:
-                for torrent in res["data"]:
-                    COMBO["data"].append(torrent)
-                total_torrents_overall = total_torrents_overall + res["total"]
-            else:
-                empty_result_counter.add(1, {"site": site})
-        COMBO["time"] = time.time() - start_time
-        COMBO["total"] = total_torrents_overall
-        if total_torrents_overall == 0:
-            span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Result not found"))
-            request_counter.add(1, {"status": "empty"})
+        calls = _search_calls(query.lower(), limit)
+        return await _run_combo(
+            span, calls, start_time, limit, sort, merge, timeout_ms, grace_ms
+        )
+
+
+@router.get("/search/stream")
+async def stream_search_combo(
+    query: str,
+    limit: Optional[int] = 0,
+    timeout_ms: Optional[int] = None,
+    format: Optional[str] = "ndjson",
+):
+    """
+    Same search as /search, streamed: one record per site as soon as it
+    answers, then a summary with every site's status and timing.
+    `format` is "ndjson" (one JSON object per line) or "sse". Rows arrive
+    per site as listed, so there is no merge or sort; `limit` caps the
+    rows of the whole stream like it does for /search.
+    """
+    with tracer.start_as_current_span("stream_search_combo") as span:
+        span.set_attribute("query", query)
+        span.set_attribute("limit", limit)
+        span.set_attribute("format", format)
+
+        error = _timeout_error(timeout_ms)
+        if error is not None:
+            return error
+        if format not in _STREAM_MEDIA_TYPES:
             return error_handler(
-                status_code=status.HTTP_404_NOT_FOUND,
-                json_message={"error": "Result not found."},
+                status_code=status.HTTP_400_BAD_REQUEST,
+                json_message={
+                    "error": "format must be one of {}.".format(
+                        ", ".join(_STREAM_MEDIA_TYPES)
+                    )
+                },
             )
-        request_counter.add(1, {"status": "success"})
-        return COMBO
+        request_counter.add(1, {"status": "requested"})
+
+        start_time = time.time()
+        calls = _search_calls(query.lower(), limit)
+        return StreamingResponse(
+            _stream(
+                calls, timeout_ms or COMBO_TIMEOUT_MS, format, start_time, limit
+            ),
+            media_type=_STREAM_MEDIA_TYPES[format],
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
 
 @router.get("/trending")
-async def get_all_trending(limit: Optional[int] = 0):
+async def get_all_trending(
+    response: Response,
+    limit: Optional[int] = 0,
+    timeout_ms: Optional[int] = None,
+    merge: Optional[bool] = True,
+    sort: Optional[str] = None,
+    grace_ms: Optional[int] = None,
+):
     with tracer.start_as_current_span("get_all_trending") as span:
         span.set_attribute("limit", limit)
+        span.set_attribute("sort", sort or "")
 
+        error = _sort_error(sort) or _timeout_error(timeout_ms)
+        if error is not None:
+            return error
         request_counter.add(1, {"status": "requested"})
 
         start_time = time.time()
@@ -82,48 +281,28 @@ async def get_all_trending(limit: Optional[int] = 0):
             for site in all_sites.keys()
             if all_sites[site]["trending_available"] and all_sites[site]["website"]
         ]
-        tasks = []
-        COMBO = {"data": []}
-        total_torrents_overall = 0
-        for site in sites_list:
-            limit = (
-                all_sites[site]["limit"]
-                if limit == 0 or limit > all_sites[site]["limit"]
-                else limit
-            )
-            tasks.append(
-                asyncio.create_task(
-                    all_sites[site]["website"]().trending(
-                        category=None, page=1, limit=limit
-                    )
-                )
-            )
-        results = await asyncio.gather(*tasks)
-        for res in results:
-            if res is not None and len(res["data"]) > 0:
-                for torrent in res["data"]:
-                    COMBO["data"].append(torrent)
-                total_torrents_overall = total_torrents_overall + res["total"]
-            else:
-                empty_result_counter.add(1, {"site": site})
-        COMBO["time"] = time.time() - start_time
-        COMBO["total"] = total_torrents_overall
-        if total_torrents_overall == 0:
-            span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Result not found"))
-            request_counter.add(1, {"status": "empty"})
-            return error_handler(
-                status_code=status.HTTP_404_NOT_FOUND,
-                json_message={"error": "Result not found."},
-            )
-        request_counter.add(1, {"status": "success"})
-        return COMBO
+        calls = _site_calls(sites_list, "trending", (None, 1), limit)
+        return await _run_combo(
+            span, calls, start_time, limit, sort, merge, timeout_ms, grace_ms, response
+        )
 
 
 @router.get("/recent")
-async def get_all_recent(limit: Optional[int] = 0):
+async def get_all_recent(
+    response: Response,
+    limit: Optional[int] = 0,
+    timeout_ms: Optional[int] = None,
+    merge: Optional[bool] = True,
+    sort: Optional[str] = None,
+    grace_ms: Optional[int] = None,
+):
     with tracer.start_as_current_span("get_all_recent") as span:
         span.set_attribute("limit", limit)
+        span.set_attribute("sort", sort or "")
 
+        error = _sort_error(sort) or _timeout_error(timeout_ms)
+        if error is not None:
+            return error
         request_counter.add(1, {"status": "requested"})
 
         start_time = time.time()
@@ -133,36 +312,7 @@ async def get_all_recent(limit: Optional[int] = 0):
             for site in all_sites.keys()
             if all_sites[site]["recent_available"] and all_sites[site]["website"]
         ]
-        tasks = []
-        COMBO = {"data": []}
-        total_torrents_overall = 0
-        for site in sites_list:
-            limit = (
-                all_sites[site]["limit"]
-                if limit == 0 or limit > all_sites[site]["limit"]
-                else limit
-            )
-            tasks.append(
-                asyncio.create_task(
-                    all_sites[site]["website"]().recent(category=None, page=1, limit=limit)
-                )
-            )
-        results = await asyncio.gather(*tasks)
-        for res in results:
-            if res is not None and len(res["data"]) > 0:
-                for torrent in res["data"]:
-                    COMBO["data"].append(torrent)
-                total_torrents_overall = total_torrents_overall + res["total"]
-            else:
-                empty_result_counter.add(1, {"site": site})
-        COMBO["time"] = time.time() - start_time
-        COMBO["total"] = total_torrents_overall
-        if total_torrents_overall == 0:
-            span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Result not found"))
-            request_counter.add(1, {"status": "empty"})
-            return error_handler(
-                status_code=status.HTTP_404_NOT_FOUND,
-                json_message={"error": "Result not found."},
-            )
-        request_counter.add(1, {"status": "success"})
-        return COMBO
\ No newline at end of file
+        calls = _site_calls(sites_list, "recent", (None, 1), limit)
+        return await _run_combo(
+            span, calls, start_time, limit, sort, merge, timeout_ms, grace_ms, response
+        )
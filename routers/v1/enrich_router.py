@@ -0,0 +1,114 @@
+import asyncio
+import time
+from fastapi import APIRouter, Query, status
+from typing import List, Optional
+from helper.is_site_available import check_if_site_available
+from helper.error_messages import error_handler
+from helper.circuit_breaker import get_breaker
+from helper.enrichment import enrich, parse_fields, project
+from helper.http_client import client_session
+from helper.normalize import normalize
+from opentelemetry import trace
+from opentelemetry.metrics import get_meter
+
+tracer = trace.get_tracer(__name__)
+meter = get_meter(__name__)
+request_counter = meter.create_counter(
+    "enrich_requests",
+    description="Number of enrich requests",
+)
+
+router = APIRouter(tags=["Enrich"])
+
+
+@router.get("/")
+@router.get("")
+async def enrich_results(
+    site: str,
+    url: List[str] = Query(...),
+    fields: Optional[str] = None,
+):
+    """
+    Fetches the detail pages of results returned earlier (e.g. by a search
+    with `fields=` set) and returns the enriched rows.
+    """
+    with tracer.start_as_current_span("enrich_results") as span:
+        span.set_attribute("site", site)
+        span.set_attribute("urls", len(url))
+
+        request_counter.add(1, {"site": site, "status": "requested"})
+
+        site = site.lower()
+        fields = parse_fields(fields)
+        all_sites = check_if_site_available(site)
+        if not all_sites:
+            span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Selected Site Not Available"))
+            request_counter.add(1, {"site": site, "status": "not_available"})
+            return error_handler(
+                status_code=status.HTTP_404_NOT_FOUND,
+                json_message={"error": "Selected Site Not Available"},
+            )
+        scraper = all_sites[site]["website"]()
+        if not hasattr(scraper, "_individual_scrap"):
+            span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Enrichment not available"))
+            request_counter.add(1, {"site": site, "status": "enrich_not_available"})
+            return error_handler(
+                status_code=status.HTTP_404_NOT_FOUND,
+                json_message={
+                    "error": "Enrichment not available for {}.".format(site)
+                },
+            )
+        # Only the site's own pages may be fetched, and no more of them than
+        # a search of that site would enrich.
+        urls = list(dict.fromkeys(url))
+        if not all(u.startswith(scraper.BASE_URL + "/") for u in urls):
+            request_counter.add(1, {"site": site, "status": "bad_url"})
+            return error_handler(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                json_message={
+                    "error": "Every url must belong to {}.".format(scraper.BASE_URL)
+                },
+            )
+        if len(urls) > all_sites[site]["limit"]:
+            request_counter.add(1, {"site": site, "status": "too_many_urls"})
+            return error_handler(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                json_message={
+                    "error": "At most {} urls per request.".format(
+                        all_sites[site]["limit"]
+                    )
+                },
+            )
+
+        breaker = get_breaker(site)
+        if not breaker.allow():
+            span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Circuit Open"))
+            request_counter.add(1, {"site": site, "status": "circuit_open"})
+            return error_handler(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                json_message={"error": "Website temporarily unavailable, retry later."},
+            )
+        start_time = time.time()
+        result = {"data": [{"url": u} for u in urls]}
+        try:
+            async with client_session() as session:
+                await enrich(session, result, scraper._individual_scrap)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            pass
+        if not any(len(row) > 1 for row in result["data"]):
+            breaker.record_failure()
+            span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Site Blocked"))
+            request_counter.add(1, {"site": site, "status": "blocked"})
+            return error_handler(
+                status_code=status.HTTP_403_FORBIDDEN,
+                json_message={"error": "Website Blocked Change IP or Website Domain."},
+            )
+        breaker.record_success()
+        normalize(result["data"], getattr(scraper, "_DATE_FORMATS", ()))
+        request_counter.add(1, {"site": site, "status": "success"})
+        result["time"] = time.time() - start_time
+        result["total"] = len(result["data"])
+        return project(result, fields)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from fastapi import status
 from typing import Optional
 from helper.is_site_available import check_if_site_available
 from helper.error_messages import error_handler
+from helper.site_runner import run_site, CIRCUIT_OPEN
+from helper.enrichment import parse_fields, fields_scope, project
+from helper.cache import cache_states, x_cache
 from opentelemetry import trace
 from opentelemetry.metrics import get_meter
 
@@ -23,10 +26,12 @@ router = APIRouter(tags=["Recent Torrents Route"])
 @router.get("/")
 @router.get("")
 async def get_recent(
+    response: Response,
     site: str,
     limit: Optional[int] = 0,
     category: Optional[str] = None,
     page: Optional[int] = 1,
+    fields: Optional[str] = None,
 ):
     with tracer.start_as_current_span("get_recent") as span:
         span.set_attribute("site", site)
@@ -38,6 +43,7 @@ async def get_recent(
 
         all_sites = check_if_site_available(site)
         site = site.lower()
+        fields = parse_fields(fields)
         category = category.lower() if category is not None else None
         if all_sites:
             limit = (
@@ -70,7 +76,15 @@ async def get_recent(
                             "available_categories": all_sites[site]["categories"],
                         },
                     )
-                resp = await all_sites[site]["website"]().recent(category, page, limit)
+                with fields_scope(fields), cache_states() as states:
+                    site_state, resp = await run_site(site, "recent", category, page, limit)
+                if site_state == CIRCUIT_OPEN:
+                    span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Circuit Open"))
+                    request_counter.add(1, {"site": site, "status": "circuit_open"})
+                    return error_handler(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        json_message={"error": "Website temporarily unavailable, retry later."},
+                    )
                 if resp is None:
                     span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Site Blocked"))
                     request_counter.add(1, {"site": site, "status": "blocked"})
@@ -83,7 +97,8 @@ async def get_recent(
 
                 elif len(resp["data"]) > 0:
                     request_counter.add(1, {"site": site, "status": "success"})
-                    return resp
+                    response.headers["X-Cache"] = x_cache(states)
+                    return project(resp, fields)
                 else:
                     span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Result not found"))
                     request_counter.add(1, {"site": site, "status": "empty"})
@@ -3,6 +3,8 @@ from typing import Optional
 from helper.is_site_available import check_if_site_available
 from fastapi import status
 from helper.error_messages import error_handler
+from helper.site_runner import run_site, CIRCUIT_OPEN
+from helper.enrichment import parse_fields, fields_scope, project
 from opentelemetry import trace
 from opentelemetry.metrics import get_meter
 
@@ -23,7 +25,11 @@ router = APIRouter(tags=["Search"])
 @router.get("/")
 @router.get("")
 async def search_for_torrents(
-    site: str, query: str, limit: Optional[int] = 0, page: Optional[int] = 1
+    site: str,
+    query: str,
+    limit: Optional[int] = 0,
+    page: Optional[int] = 1,
+    fields: Optional[str] = None,
 ):
     with tracer.start_as_current_span("search_for_torrents") as span:
         span.set_attribute("site", site)
@@ -34,6 +40,7 @@ async def search_for_torrents(
         request_counter.add(1, {"site": site, "status": "requested"})
 
         site = site.lower()
+        fields = parse_fields(fields)
         query = query.lower()
         all_sites = check_if_site_available(site)
         if all_sites:
@@ -43,7 +50,15 @@ async def search_for_torrents(
                 else limit
             )
 
-            resp = await all_sites[site]["website"]().search(query, page, limit)
+            with fields_scope(fields):
+                site_state, resp = await run_site(site, "search", query, page, limit)
+            if site_state == CIRCUIT_OPEN:
+                span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Circuit Open"))
+                request_counter.add(1, {"site": site, "status": "circuit_open"})
+                return error_handler(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    json_message={"error": "Website temporarily unavailable, retry later."},
+                )
             if resp is None:
                 span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Site Blocked"))
                 request_counter.add(1, {"site": site, "status": "blocked"})
@@ -53,7 +68,7 @@ async def search_for_torrents(
                 )
             elif len(resp["data"]) > 0:
                 request_counter.add(1, {"site": site, "status": "success"})
-                return resp
+                return project(resp, fields)
             else:
                 span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Result not found"))
                 request_counter.add(1, {"site": site, "status": "empty"})
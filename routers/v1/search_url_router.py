@@ -3,6 +3,7 @@ from typing import Optional
 from helper.is_site_available import check_if_site_available
 from fastapi import status
 from helper.error_messages import error_handler
+from helper.site_runner import run_site, CIRCUIT_OPEN
 from opentelemetry import trace
 from opentelemetry.metrics import get_meter
 
@@ -43,7 +44,14 @@ async def search_for_torrents(
                 else limit
             )
 
-            resp = await all_sites[site]["website"]().search(query, page, limit)
+            site_state, resp = await run_site(site, "search", query, page, limit)
+            if site_state == CIRCUIT_OPEN:
+                span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Circuit Open"))
+                request_counter.add(1, {"site": site, "status": "circuit_open"})
+                return error_handler(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    json_message={"error": "Website temporarily unavailable, retry later."},
+                )
             if resp is None:
                 span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Site Blocked"))
                 request_counter.add(1, {"site": site, "status": "blocked"})
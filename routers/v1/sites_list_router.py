@@ -1,6 +1,7 @@
 from fastapi import APIRouter, status
 from helper.is_site_available import check_if_site_available, sites_config
 from helper.error_messages import error_handler
+from helper.circuit_breaker import get_breaker
 from opentelemetry import trace
 from opentelemetry.metrics import get_meter
 
@@ -40,5 +41,8 @@ async def get_site_config():
         request_counter.add(1, {"status": "success"})
         return error_handler(
             status_code=status.HTTP_200_OK,
-            json_message=sites_config
+            json_message={
+                key: {**site_info, "circuit": get_breaker(key).snapshot()}
+                for key, site_info in sites_config.items()
+            },
         )
\ No newline at end of file
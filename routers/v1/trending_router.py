@@ -1,7 +1,10 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 from typing import Optional
 from helper.is_site_available import check_if_site_available
 from helper.error_messages import error_handler
+from helper.site_runner import run_site, CIRCUIT_OPEN
+from helper.enrichment import parse_fields, fields_scope, project
+from helper.cache import cache_states, x_cache
 from opentelemetry import trace
 from opentelemetry.metrics import get_meter
 
@@ -22,10 +25,12 @@ router = APIRouter(tags=["Trending Torrents"])
 @router.get("/")
 @router.get("")
 async def get_trending(
+    response: Response,
     site: str,
     limit: Optional[int] = 0,
     category: Optional[str] = None,
     page: Optional[int] = 1,
+    fields: Optional[str] = None,
 ):
     with tracer.start_as_current_span("get_trending") as span:
         span.set_attribute("site", site)
@@ -36,6 +41,7 @@ async def get_trending(
         request_counter.add(1, {"site": site, "status": "requested"})
 
         site = site.lower()
+        fields = parse_fields(fields)
         all_sites = check_if_site_available(site)
         category = category.lower() if category is not None else None
         if all_sites:
@@ -66,7 +72,15 @@ async def get_trending(
                             "available_categories": all_sites[site]["categories"],
                         },
                     )
-                resp = await all_sites[site]["website"]().trending(category, page, limit)
+                with fields_scope(fields), cache_states() as states:
+                    site_state, resp = await run_site(site, "trending", category, page, limit)
+                if site_state == CIRCUIT_OPEN:
+                    span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Circuit Open"))
+                    request_counter.add(1, {"site": site, "status": "circuit_open"})
+                    return error_handler(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        json_message={"error": "Website temporarily unavailable, retry later."},
+                    )
                 if resp is None:
                     span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Site Blocked"))
                     request_counter.add(1, {"site": site, "status": "blocked"})
@@ -78,7 +92,8 @@ async def get_trending(
                     )
                 elif len(resp["data"]) > 0:
                     request_counter.add(1, {"site": site, "status": "success"})
-                    return resp
+                    response.headers["X-Cache"] = x_cache(states)
+                    return project(resp, fields)
                 else:
                     span.set_status(trace.status.Status(trace.status.StatusCode.ERROR, "Result not found"))
                     request_counter.add(1, {"site": site, "status": "empty"})
@@ -0,0 +1,180 @@
+import pytest
+
+from helper import cache as cache_module
+from helper.cache import (
+    FRESH,
+    REVALIDATED,
+    STALE,
+    ResultCache,
+    cache_key,
+    cache_states,
+    encode,
+    report,
+    x_cache,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def _key(query, lazy=False):
+    return cache_key("1337x", "search", (query, 1, 20), lazy)
+
+
+def _value(n, pad=0):
+    return {"data": [{"name": "row{}".format(i), "pad": "x" * pad} for i in range(n)]}
+
+
+def test_cache_key_normalizes_case_and_skips_unknown_methods():
+    key = cache_key("1337x", "search", ("Avengers", 1, 20))
+    assert key == ("1337x", "search", "avengers", None, 1, 20, False)
+    key = cache_key("1337x", "trending", ("Movies", 1, 50), True)
+    assert key == ("1337x", "trending", None, "movies", 1, 50, True)
+    assert cache_key("1337x", "enrich", ()) is None
+
+
+def test_get_returns_a_copy(clock):
+    cache = ResultCache(max_bytes=10**6)
+    cache.put(_key("a"), _value(2))
+    value, fresh = cache.get(_key("a"))
+    value["data"].append("junk")
+    assert fresh
+    assert len(cache.get(_key("a"))[0]["data"]) == 2
+
+
+def test_get_tries_keys_in_order(clock):
+    cache = ResultCache(max_bytes=10**6)
+    cache.put(_key("a", lazy=True), _value(1))
+    assert cache.get(_key("a"), _key("a", lazy=True))[0] == _value(1)
+    assert cache.get(_key("b")) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire(clock):
+    cache = ResultCache(
+        max_bytes=10**6, ttls={"search": 10}, stale_ttls={"search": 0}
+    )
+    cache.put(_key("a"), _value(1))
+    clock.now += 9.9
+    assert cache.get(_key("a")) is not None
+    clock.now += 0.2
+    assert cache.get(_key("a")) is None
+    assert cache.bytes == 0
+
+
+def test_evicts_least_recently_used_by_bytes(clock):
+    size = len(encode(_value(1, pad=100)))
+    cache = ResultCache(max_bytes=size * 2)
+    cache.put(_key("a"), _value(1, pad=100))
+    cache.put(_key("b"), _value(1, pad=100))
+    cache.get(_key("a"))
+    cache.put(_key("c"), _value(1, pad=100))
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("a")) is not None
+    assert cache.get(_key("c")) is not None
+    assert cache.bytes == size * 2
+    assert cache.evictions == 1
+
+
+def test_skips_values_larger_than_the_cache(clock):
+    cache = ResultCache(max_bytes=50)
+    cache.put(_key("a"), _value(10, pad=100))
+    assert cache.get(_key("a")) is None
+    assert cache.bytes == 0
+
+
+def test_replacing_an_entry_keeps_byte_count_right(clock):
+    cache = ResultCache(max_bytes=10**6)
+    cache.put(_key("a"), _value(5))
+    cache.put(_key("a"), _value(1))
+    assert cache.bytes == len(encode(_value(1)))
+
+
+def test_zero_ttl_disables_a_kind(clock):
+    cache = ResultCache(max_bytes=10**6, ttls={"search": 0})
+    cache.put(_key("a"), _value(1))
+    assert cache.get(_key("a")) is None
+
+
+def test_clear_by_site(clock):
+    cache = ResultCache(max_bytes=10**6)
+    cache.put(_key("a"), _value(1))
+    cache.put(cache_key("yts", "search", ("a", 1, 20)), _value(1))
+    assert cache.clear("1337x") == 1
+    assert cache.get(_key("a")) is None
+    assert cache.bytes == len(encode(_value(1)))
+
+
+def _swr_cache():
+    return ResultCache(
+        max_bytes=10**6, ttls={"trending": 10}, stale_ttls={"trending": 30}
+    )
+
+
+def _trending(category=None, lazy=False):
+    return cache_key("1337x", "trending", (category, 1, 50), lazy)
+
+
+def test_entries_go_stale_before_they_expire(clock):
+    cache = _swr_cache()
+    cache.put(_trending(), _value(1))
+    assert cache.get(_trending())[1] is True
+    clock.now += 11
+    assert cache.get(_trending()) == (_value(1), False)
+    clock.now += 30
+    assert cache.get(_trending()) is None
+
+
+def test_fresh_entry_wins_over_an_earlier_stale_one(clock):
+    cache = _swr_cache()
+    cache.put(_trending(), _value(1))
+    clock.now += 11
+    cache.put(_trending(lazy=True), _value(2))
+    value, fresh = cache.get(_trending(), _trending(lazy=True))
+    assert fresh and value == _value(2)
+
+
+def test_put_with_negative_ttl_stores_a_stale_entry(clock):
+    cache = _swr_cache()
+    cache.put(_trending(), _value(1), ttl=-5, stale_ttl=20)
+    assert cache.get(_trending())[1] is False
+    clock.now += 15.1
+    assert cache.get(_trending()) is None
+
+
+def test_fresh_for(clock):
+    cache = _swr_cache()
+    assert cache.fresh_for(_trending()) is None
+    cache.put(_trending(), _value(1))
+    clock.now += 4
+    assert cache.fresh_for(_trending()) == pytest.approx(6)
+    clock.now += 10
+    assert cache.fresh_for(_trending()) == 0
+    assert cache.hits == 0
+
+
+def test_x_cache_summarizes_states():
+    assert x_cache([FRESH, FRESH]) == FRESH
+    assert x_cache([FRESH, REVALIDATED]) == REVALIDATED
+    assert x_cache([REVALIDATED, STALE, FRESH]) == STALE
+    assert x_cache([]) == REVALIDATED
+
+
+def test_cache_states_collects_reports():
+    report(STALE)
+    with cache_states() as states:
+        report(STALE)
+    report(STALE)
+    assert states == [STALE]
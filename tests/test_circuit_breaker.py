@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from helper import circuit_breaker as breaker_module
+from helper import site_runner
+from helper.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from helper.site_runner import TIMEOUT, run_sites
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker_module.time, "monotonic", clock)
+    return clock
+
+
+def _open(threshold=3):
+    breaker = CircuitBreaker(threshold=threshold, reset_timeout=30)
+    for _ in range(threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_trips_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["retry_in"] == 30
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = _open()
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes(clock):
+    breaker = _open()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = _open()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+
+
+def test_released_probe_can_be_retried(clock):
+    breaker = _open()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+@pytest.fixture
+def slow_site(monkeypatch):
+    monkeypatch.setattr(breaker_module, "breakers", {})
+
+    async def run_site(site, method, *args):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(site_runner, "run_site", run_site)
+    return {"slow": ("search", ("q", 1, 10))}
+
+
+def test_short_budgets_do_not_count_against_the_circuit(slow_site):
+    results = asyncio.run(run_sites(slow_site, 50))
+    assert results == {"slow": (TIMEOUT, None)}
+    assert breaker_module.get_breaker("slow").failures == 0
+
+
+def test_budgets_past_the_floor_count_against_the_circuit(slow_site, monkeypatch):
+    monkeypatch.setattr(site_runner, "CIRCUIT_TIMEOUT_FLOOR_MS", 50)
+    results = asyncio.run(run_sites(slow_site, 50))
+    assert results == {"slow": (TIMEOUT, None)}
+    assert breaker_module.get_breaker("slow").failures == 1
@@ -0,0 +1,75 @@
+import base64
+import binascii
+
+from helper.merge import infohash, merge_by_infohash
+
+HEX = "c9e15763f722f23e98a29decdfae341b98d53056"
+BASE32 = base64.b32encode(binascii.unhexlify(HEX)).decode()
+
+
+def test_infohash_from_hash_field():
+    assert infohash({"hash": HEX.upper()}) == HEX
+
+
+def test_infohash_from_hex_magnet():
+    assert infohash({"magnet": "magnet:?xt=urn:btih:{}&dn=x".format(HEX)}) == HEX
+
+
+def test_infohash_converts_base32_magnet():
+    assert infohash({"magnet": "magnet:?xt=urn:btih:" + BASE32}) == HEX
+
+
+def test_infohash_falls_back_to_magnet_when_hash_is_junk():
+    row = {"hash": "not-a-hash", "magnet": "magnet:?xt=urn:btih:" + HEX}
+    assert infohash(row) == HEX
+
+
+def test_infohash_missing():
+    assert infohash({}) is None
+    assert infohash({"hash": None, "magnet": "magnet:?dn=nothing"}) is None
+
+
+def test_merge_combines_rows_sharing_an_infohash():
+    merged = merge_by_infohash(
+        [
+            ("a", [{"name": "X", "hash": HEX, "seeders": 5, "url": "a/1"}]),
+            (
+                "b",
+                [
+                    {
+                        "name": "X",
+                        "magnet": "magnet:?xt=urn:btih:" + BASE32,
+                        "seeders": 9,
+                        "leechers": 2,
+                        "size": "1 GB",
+                        "url": "b/1",
+                    }
+                ],
+            ),
+        ]
+    )
+    assert len(merged) == 1
+    row = merged[0]
+    assert row["hash"] == HEX
+    assert row["seeders"] == 9
+    assert row["leechers"] == 2
+    assert row["size"] == "1 GB"
+    assert row["sources"] == [{"site": "a", "url": "a/1"}, {"site": "b", "url": "b/1"}]
+
+
+def test_merge_keeps_rows_without_infohash_and_first_seen_order():
+    merged = merge_by_infohash(
+        [
+            ("a", [{"name": "no hash", "url": "a/1"}, {"hash": HEX, "url": "a/2"}]),
+            ("b", [{"hash": HEX, "url": "b/2"}, {"name": "other", "url": "b/3"}]),
+        ]
+    )
+    assert [row.get("name") for row in merged] == ["no hash", None, "other"]
+    assert merged[0]["sources"] == [{"site": "a", "url": "a/1"}]
+    assert len(merged[1]["sources"]) == 2
+
+
+def test_merge_does_not_modify_input_rows():
+    row = {"hash": HEX, "seeders": 1, "url": "a/1"}
+    merge_by_infohash([("a", [row]), ("b", [{"hash": HEX, "seeders": 4}])])
+    assert row == {"hash": HEX, "seeders": 1, "url": "a/1"}
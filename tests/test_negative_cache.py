@@ -0,0 +1,84 @@
+import pytest
+
+from helper import cache as cache_module
+from helper.cache import NegativeCache, cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def _key(query, site="1337x"):
+    return cache_key(site, "search", (query, 1, 20))
+
+
+def _cache(max_entries=100):
+    return NegativeCache(max_entries, {"empty": 60, "blocked": 30})
+
+
+def test_empty_is_remembered_for_its_ttl(clock):
+    cache = _cache()
+    cache.put(_key("a"), "empty", {"data": [], "total": 0})
+    clock.now += 59
+    assert cache.get(_key("a")) == ("empty", {"data": [], "total": 0})
+    clock.now += 1
+    assert cache.get(_key("a")) is None
+
+
+def test_blocked_is_remembered_for_its_ttl(clock):
+    cache = _cache()
+    cache.put(_key("a"), "blocked", None)
+    clock.now += 29
+    assert cache.get(_key("a")) == ("blocked", None)
+    clock.now += 1
+    assert cache.get(_key("a")) is None
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_statuses_without_a_ttl_are_not_kept(clock):
+    cache = _cache()
+    cache.put(_key("a"), "timeout", None)
+    assert cache.get(_key("a")) is None
+    disabled = _cache(max_entries=0)
+    disabled.put(_key("a"), "empty", None)
+    assert disabled.get(_key("a")) is None
+
+
+def test_get_returns_a_copy(clock):
+    cache = _cache()
+    cache.put(_key("a"), "empty", {"data": [], "total": 0})
+    status, value = cache.get(_key("a"))
+    value["data"].append("junk")
+    value["total"] = 5
+    assert cache.get(_key("a")) == ("empty", {"data": [], "total": 0})
+
+
+def test_oldest_dropped_past_max_entries(clock):
+    cache = _cache(max_entries=2)
+    for query in ("a", "b", "c"):
+        cache.put(_key(query), "empty", None)
+    assert cache.get(_key("a")) is None
+    assert cache.get(_key("b")) and cache.get(_key("c"))
+
+
+def test_discard_and_clear_by_site(clock):
+    cache = _cache()
+    cache.put(_key("a"), "empty", None)
+    cache.put(_key("b"), "blocked", None)
+    cache.put(_key("a", site="tgx"), "empty", None)
+    cache.discard(_key("a"))
+    assert cache.get(_key("a")) is None
+    assert cache.clear("1337x") == 1
+    assert cache.get(_key("a", site="tgx")) == ("empty", None)
+    assert cache.clear() == 1
@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from helper.normalize import normalize, parse_count, parse_date, parse_size
+
+NOW = datetime(2024, 3, 15, 12, 30, tzinfo=timezone.utc)
+
+
+def _epoch(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("1.4 GB", int(1.4 * 1024**3)),
+        ("700,5 MiB", int(700.5 * 1024**2)),
+        ("1,234 MB", 1234 * 1024**2),
+        ("10 Mb", 10 * 1024**2),
+        ("512 B", 512),
+        ("2 TiB", 2 * 1024**4),
+        ("", None),
+        (None, None),
+        ("N/A", None),
+    ],
+)
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("1,234", 1234), (" 42 ", 42), (7, 7), ("-", None), (None, None)],
+)
+def test_parse_count(text, expected):
+    assert parse_count(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, seconds",
+    [
+        ("3 days ago", 3 * 86400),
+        ("an hour ago", 3600),
+        ("5 mins", 300),
+        ("1 year", 365 * 86400),
+    ],
+)
+def test_parse_date_ages(text, seconds):
+    assert parse_date(text, now=NOW) == int(NOW.timestamp()) - seconds
+
+
+def test_parse_date_day_words():
+    assert parse_date("Today 09:15", now=NOW) == _epoch(2024, 3, 15, 9, 15)
+    assert parse_date("Y-day 23:05", now=NOW) == _epoch(2024, 3, 14, 23, 5)
+    assert parse_date("Yesterday", now=NOW) == _epoch(2024, 3, 14, 0, 0)
+
+
+def test_parse_date_formats_in_order():
+    formats = ("%m/%d/%Y", "%b %d, %Y")
+    assert parse_date("02/29/2024", formats, NOW) == _epoch(2024, 2, 29)
+    assert parse_date("Jan 2, 2023", formats, NOW) == _epoch(2023, 1, 2)
+    assert parse_date("2023-01-02", formats, NOW) is None
+
+
+def test_parse_date_strips_ordinals_and_dots():
+    assert parse_date("Mar. 3rd '21", ("%b %d '%y",), NOW) == _epoch(2021, 3, 3)
+
+
+def test_parse_date_without_year_uses_current_year():
+    assert parse_date("03-01 10:20", ("%m-%d %H:%M",), NOW) == _epoch(
+        2024, 3, 1, 10, 20
+    )
+
+
+def test_parse_date_without_day_uses_today():
+    assert parse_date("8:40pm", ("%I:%M%p",), NOW) == _epoch(2024, 3, 15, 20, 40)
+
+
+def test_parse_date_empty():
+    assert parse_date("", ("%Y",), NOW) is None
+    assert parse_date(None, ("%Y",), NOW) is None
+
+
+def test_normalize_adds_typed_fields():
+    rows = [
+        {"size": "1 GiB", "seeders": "1,024", "leechers": "3", "date": "2 days ago"},
+        {"size": "1 GiB", "seeders": "n/a", "date": None},
+        {"torrents": [{"size": "700 MB"}, "not a dict"]},
+    ]
+    assert normalize(rows) is rows
+    assert rows[0]["size_bytes"] == 1024**3
+    assert rows[0]["seeders"] == 1024
+    assert rows[0]["leechers"] == 3
+    assert isinstance(rows[0]["uploaded_at"], int)
+    assert rows[1]["seeders"] == "n/a"
+    assert "uploaded_at" not in rows[1]
+    assert rows[2]["torrents"][0]["size_bytes"] == 700 * 1024**2
@@ -0,0 +1,38 @@
+import pytest
+
+from helper import prewarm
+from helper.cache import cache_key, result_cache
+from helper.prewarm import Prewarmer, listings
+
+
+def _horizon(site, method):
+    key = cache_key(site, method, (None, 1, prewarm.all_sites[site]["limit"]))
+    return result_cache.ttl_for(key) + result_cache.stale_ttl_for(key)
+
+
+@pytest.mark.parametrize("site", sorted(listings()))
+def test_listings_are_revisited_before_they_expire(site):
+    jobs, spacing, revisit = Prewarmer().plan(site, listings()[site])
+    assert jobs
+    assert revisit >= spacing * len(jobs)
+    for method in {method for method, _ in jobs}:
+        assert revisit <= _horizon(site, method)
+
+
+def test_plan_drops_categorised_listings_first(monkeypatch):
+    site = "1337x"
+    monkeypatch.setitem(prewarm.all_sites[site], "rate_limit", 1)
+    every = listings()[site]
+    jobs, spacing, revisit = Prewarmer(period=240, jitter=0.5).plan(site, every)
+    assert 0 < len(jobs) < len(every)
+    uncategorised = [job for job in every if job[1] is None]
+    assert jobs[: len(uncategorised)] == uncategorised
+    assert revisit <= _horizon(site, "recent")
+
+
+def test_fresh_looks_as_far_as_the_next_visit(monkeypatch):
+    monkeypatch.setattr(prewarm.result_cache, "fresh_for", lambda key: 500)
+    monkeypatch.setattr(prewarm.shared_cache, "fresh_for", lambda key: None)
+    warmer = Prewarmer(period=240)
+    assert warmer._fresh(("key",), revisit=400)
+    assert not warmer._fresh(("key",), revisit=1000)
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+
+from helper import ranking
+from helper import site_runner
+from helper.ranking import run_sites_ranked, sort_key, top_k
+from helper.site_runner import OK, SKIPPED, TIMEOUT
+from routers.v1.combo_routers import _stream
+
+
+class FakeSites:
+    """
+    Stands in for run_site: each site answers its rows after its delay, and
+    how every scrape ended is recorded.
+    """
+
+    def __init__(self, sites):
+        self.sites = sites
+        self.finished = []
+        self.cancelled = []
+
+    async def __call__(self, site, method, *args):
+        delay, seeders = self.sites[site]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(site)
+            raise
+        self.finished.append(site)
+        data = [
+            {"name": "{}-{}".format(site, s), "url": "{}/{}".format(site, s), "seeders": s}
+            for s in seeders
+        ]
+        return OK, {"data": data, "total": len(data)}
+
+
+@pytest.fixture
+def sites(monkeypatch):
+    fake = FakeSites(
+        {
+            "fast": (0, [10, 9, 8]),
+            "slow": (0.2, [500, 400]),
+        }
+    )
+    monkeypatch.setattr(site_runner, "run_site", fake)
+    monkeypatch.setattr(ranking, "COMBO_GRACE_MS", None)
+    return fake
+
+
+def _calls(fake):
+    return {site: ("search", ("q", 1, 10)) for site in fake.sites}
+
+
+def test_sort_key_ranks_rows_without_a_value_last():
+    rows = [{"seeders": None}, {"seeders": 3}, {}, {"seeders": 7}]
+    ranked = sorted(rows, key=sort_key("seeders"), reverse=True)
+    assert [row.get("seeders") for row in ranked] == [7, 3, None, None]
+
+
+def test_top_k_keeps_ties_in_input_order():
+    rows = [{"id": i, "size_bytes": s} for i, s in enumerate([5, 9, 5, 1, 9])]
+    best = top_k(rows, 3, sort_key("size"))
+    assert [row["id"] for row in best] == [1, 4, 0]
+
+
+def test_top_k_without_limit_sorts_everything():
+    rows = [{"uploaded_at": t} for t in (2, None, 3, 1)]
+    ranked = top_k(rows, 0, sort_key("date"))
+    assert [row.get("uploaded_at") for row in ranked] == [3, 2, 1, None]
+
+
+def test_ranked_waits_for_every_site_without_grace(sites):
+    results = asyncio.run(run_sites_ranked(_calls(sites), 5000, 2))
+    assert {site: state for site, (state, _) in results.items()} == {
+        "fast": OK,
+        "slow": OK,
+    }
+    rows = [row for _, res in results.values() for row in res["data"]]
+    assert [row["seeders"] for row in top_k(rows, 2, sort_key("seeders"))] == [
+        500,
+        400,
+    ]
+
+
+def test_grace_skips_slow_sites_and_lets_them_finish(sites):
+    async def run():
+        results = await run_sites_ranked(_calls(sites), 5000, 2, grace_ms=10)
+        assert sites.finished == ["fast"]
+        await asyncio.sleep(0.4)
+        return results
+
+    results = asyncio.run(run())
+    assert results["fast"][0] == OK
+    assert results["slow"] == (SKIPPED, None)
+    assert sites.finished == ["fast", "slow"]
+    assert sites.cancelled == []
+
+
+def test_grace_only_starts_once_limit_distinct_rows_arrived(sites):
+    results = asyncio.run(run_sites_ranked(_calls(sites), 5000, 4, grace_ms=10))
+    assert results["slow"][0] == OK
+
+
+def test_skipped_sites_are_cancelled_at_the_budget(sites):
+    sites.sites["slow"] = (5, [500])
+
+    async def run():
+        results = await run_sites_ranked(_calls(sites), 600, 2, grace_ms=10)
+        assert sites.cancelled == []
+        await asyncio.sleep(0.8)
+        assert sites.cancelled == ["slow"]
+        return results
+
+    assert asyncio.run(run())["slow"] == (SKIPPED, None)
+
+
+def test_sites_past_the_budget_time_out(sites):
+    sites.sites["slow"] = (5, [500])
+
+    async def run():
+        results = await run_sites_ranked(_calls(sites), 500, 2)
+        await asyncio.sleep(0)
+        assert sites.cancelled == ["slow"]
+        return results
+
+    results = asyncio.run(run())
+    assert results["fast"][0] == OK
+    assert results["slow"] == (TIMEOUT, None)
+
+
+def test_stream_limit_skips_sites_still_running(sites):
+    async def run():
+        frames = [
+            json.loads(frame)
+            async for frame in _stream(_calls(sites), 5000, "ndjson", 0, limit=2)
+        ]
+        assert sites.finished == ["fast"]
+        await asyncio.sleep(0.4)
+        return frames
+
+    frames = asyncio.run(run())
+    assert [frame["type"] for frame in frames] == ["results", "summary"]
+    assert frames[-1]["status"] == {"fast": OK, "slow": SKIPPED}
+    assert sites.finished == ["fast", "slow"]
@@ -0,0 +1,163 @@
+import json
+
+import pytest
+
+from helper import shared_cache as shared_module
+from helper.shared_cache import _HEAD_AT, _SEQ, _SLOT, SharedCache, _digest
+
+pytest.importorskip("fcntl")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(shared_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make(tmp_path):
+    opened = []
+
+    def make(ring_size=4096, slots=64):
+        cache = SharedCache(str(tmp_path / "cache.shm"), ring_size, slots)
+        cache.start()
+        assert cache.enabled
+        opened.append(cache)
+        return cache
+
+    yield make
+    for cache in opened:
+        cache.stop()
+
+
+def _key(query, site="1337x"):
+    return (site, "search", query, None, 1, 20, False)
+
+
+def _payload(n, pad=0):
+    return json.dumps({"data": ["x" * pad] * n}).encode()
+
+
+def _slot_of(cache, key):
+    digest = _digest(key)
+    for at in cache._bucket(digest):
+        if _SLOT.unpack_from(cache._mm, at)[1] == digest:
+            return at
+    return None
+
+
+def test_round_trip_between_workers(make, clock):
+    writer, reader = make(), make()
+    writer.put(_key("a"), _payload(3), 10, 20)
+    payload, fresh, left = reader.get(_key("b"), _key("a"))
+    assert payload == _payload(3)
+    assert (fresh, left) == (10, 30)
+
+
+def test_entries_go_stale_then_expire(make, clock):
+    cache = make()
+    cache.put(_key("a"), _payload(1), 10, 20)
+    clock.now += 15
+    assert cache.get(_key("a"))[1] == -5
+    assert cache.fresh_for(_key("a")) == 0
+    clock.now += 15
+    assert cache.get(_key("a")) is None
+    assert cache.fresh_for(_key("a")) is None
+
+
+def test_put_replaces_the_same_key(make, clock):
+    cache = make()
+    cache.put(_key("a"), _payload(1), 10)
+    cache.put(_key("a"), _payload(2), 10)
+    assert cache.get(_key("a"))[0] == _payload(2)
+    assert cache.snapshot()["entries"] == 1
+
+
+def test_ring_wrap_invalidates_overwritten_entries(make, clock):
+    cache = make(ring_size=1000)
+    cache.put(_key("a"), _payload(1, pad=400), 10)
+    cache.put(_key("b"), _payload(1, pad=400), 10)
+    assert cache.get(_key("a")) is not None
+    # Doesn't fit behind "b", so it wraps to the start over "a".
+    cache.put(_key("c"), _payload(1, pad=400), 10)
+    assert cache.get(_key("a")) is None
+    assert cache.get(_key("b"))[0] == _payload(1, pad=400)
+    assert cache.get(_key("c"))[0] == _payload(1, pad=400)
+    assert cache.snapshot()["entries"] == 2
+
+
+def test_reader_rejects_bytes_reserved_by_a_writer(make, clock):
+    cache = make()
+    cache.put(_key("a"), _payload(1), 10)
+    pos = _SLOT.unpack_from(cache._mm, _slot_of(cache, _key("a")))[2]
+    # A writer has reserved the ring space "a" lives in but not finished.
+    _SEQ.pack_into(cache._mm, _HEAD_AT, pos + cache.ring_size + 1)
+    assert cache.get(_key("a")) is None
+
+
+def test_reader_skips_a_slot_being_written(make, clock):
+    cache = make()
+    cache.put(_key("a"), _payload(1), 10)
+    at = _slot_of(cache, _key("a"))
+    seq = _SEQ.unpack_from(cache._mm, at)[0]
+    _SEQ.pack_into(cache._mm, at, seq + 1)
+    assert cache.get(_key("a")) is None
+    # A writer that died mid-update doesn't wedge the slot for good.
+    cache.put(_key("a"), _payload(2), 10)
+    assert cache.get(_key("a"))[0] == _payload(2)
+
+
+def test_full_bucket_replaces_the_entry_closest_to_expiry(make, clock):
+    cache = make(slots=4)
+    for i, ttl in enumerate((50, 10, 30, 40)):
+        cache.put(_key(str(i)), _payload(1), ttl)
+    cache.put(_key("new"), _payload(1), 60)
+    assert cache.get(_key("1")) is None
+    assert all(cache.get(_key(k)) for k in ("0", "2", "3", "new"))
+
+
+def test_oversized_and_zero_ttl_values_are_skipped(make, clock):
+    cache = make(ring_size=100)
+    cache.put(_key("big"), _payload(1, pad=200), 10)
+    cache.put(_key("zero"), _payload(1), 0, 0)
+    assert cache.get(_key("big")) is None
+    assert cache.get(_key("zero")) is None
+
+
+def test_clear_by_site_and_generation(make, clock):
+    one, two = make(), make()
+    one.put(_key("a"), _payload(1), 10)
+    one.put(_key("a", site="yts"), _payload(1), 10)
+    assert not two.flushed_elsewhere()
+    assert one.clear("yts") == 1
+    assert one.get(_key("a")) is not None
+    assert one.get(_key("a", site="yts")) is None
+    assert not one.flushed_elsewhere()
+    assert two.flushed_elsewhere()
+    assert not two.flushed_elsewhere()
+
+
+def test_layout_change_starts_empty(make, clock):
+    make().put(_key("a"), _payload(1), 10)
+    assert make().get(_key("a")) is not None
+    assert make(slots=128).get(_key("a")) is None
+
+
+def test_disabled_without_fcntl(monkeypatch, tmp_path):
+    monkeypatch.setattr(shared_module, "fcntl", None)
+    cache = SharedCache(str(tmp_path / "cache.shm"), 4096, 16)
+    cache.start()
+    assert not cache.enabled
+    cache.put(_key("a"), _payload(1), 10)
+    assert cache.get(_key("a")) is None
+    assert cache.clear() == 0
+    assert not (tmp_path / "cache.shm").exists()
@@ -0,0 +1,105 @@
+import asyncio
+
+from helper.singleflight import SingleFlight, normalize_url
+
+
+class Work:
+    """
+    An upstream fetch that takes `delay` seconds, counting how often it ran
+    and whether it was cancelled.
+    """
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return "body{}".format(self.started)
+
+
+def test_normalize_url_sorts_query_and_drops_fragment():
+    assert (
+        normalize_url("HTTPS://Example.COM/a?b=2&a=1#top")
+        == "https://example.com/a?a=1&b=2"
+    )
+    assert normalize_url("http://example.com") == "http://example.com/"
+
+
+def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight("test")
+    work = Work()
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["body1"] * 5
+    assert work.started == 1
+
+
+def test_calls_after_completion_fetch_again():
+    flight = SingleFlight("test")
+    work = Work(0)
+
+    async def run():
+        return [await flight.do("k", work), await flight.do("k", work)]
+
+    assert asyncio.run(run()) == ["body1", "body2"]
+
+
+def test_cancelled_waiter_leaves_the_fetch_running():
+    flight = SingleFlight("test")
+    work = Work()
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("k", work))
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        await asyncio.gather(follower, return_exceptions=True)
+        assert follower.cancelled()
+        return await leader
+
+    assert asyncio.run(run()) == "body1"
+    assert work.started == 1
+    assert work.cancelled == 0
+
+
+def test_cancelled_leader_leaves_the_fetch_to_its_followers():
+    flight = SingleFlight("test")
+    work = Work()
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "body1"
+    assert work.cancelled == 0
+
+
+def test_last_waiter_cancelled_drops_the_fetch():
+    flight = SingleFlight("test")
+    work = Work(1)
+
+    async def run():
+        waiter = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert work.cancelled == 1
+        # The next caller starts afresh rather than joining the dead fetch.
+        work.delay = 0
+        return await flight.do("k", work)
+
+    assert asyncio.run(run()) == "body2"
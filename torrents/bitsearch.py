@@ -1,13 +1,15 @@
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.html_scraper import Scraper
+from helper.http_client import client_session
+from helper.parser import make_soup
+from helper.parse_pool import parse
 from constants.base_url import BITSEARCH
 
 
 class Bitsearch:
     _name = "Bit Search"
+    _DATE_FORMATS = ("%b %d, %Y",)
     def __init__(self):
         self.BASE_URL = BITSEARCH
         self.LIMIT = None
@@ -15,7 +17,7 @@ class Bitsearch:
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
 
                 my_dict = {"data": []}
                 for divs in soup.find_all("li", class_="search-result"):
@@ -85,7 +87,7 @@ class Bitsearch:
             return None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/search?q={}&page={}".format(query, page)
@@ -93,7 +95,7 @@ class Bitsearch:
 
     async def parser_result(self, start_time, url, session):
         html = await Scraper().get_all_results(session, url)
-        results = self._parser(html)
+        results = await parse(self._parser, html)
         if results is not None:
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
@@ -101,7 +103,7 @@ class Bitsearch:
         return results
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/trending"
@@ -1,7 +1,9 @@
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.html_scraper import Scraper
+from helper.http_client import client_session
+from helper.parser import make_soup
+from helper.parse_pool import parse
+from helper.streaming import Rows
 from constants.base_url import GLODLS
 
 
@@ -14,7 +16,7 @@ class Glodls:
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
 
                 my_dict = {"data": []}
                 for tr in soup.find_all("tr", class_="t-row")[0:-1:2]:
@@ -56,7 +58,7 @@ class Glodls:
             return None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = (
@@ -67,9 +69,14 @@ class Glodls:
             )
             return await self.parser_result(start_time, url, session)
 
+    def _rows(self):
+        # Every result row is followed by a spacer row; only the rows up to
+        # LIMIT are parsed, so stop reading after them.
+        return Rows(("tr", {"class": "t-row"}), 2 * self.LIMIT + 1)
+
     async def parser_result(self, start_time, url, session):
-        html = await Scraper().get_all_results(session, url)
-        results = self._parser(html)
+        html = await Scraper().get_all_results(session, url, rows=self._rows())
+        results = await parse(self._parser, html)
         if results is not None:
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
@@ -77,14 +84,14 @@ class Glodls:
         return results
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/today.php"
             return await self.parser_result(start_time, url, session)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/search.php"
@@ -1,16 +1,22 @@
-import asyncio
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import KICKASS
-from constants.headers import HEADER_AIO
 
 
 class Kickass:
     _name = "Kick Ass"
+    _DETAIL_FIELDS = {"poster", "screenshot", "hash", "magnet"}
+    _DETAIL_SPEC = Extract(
+        ("a", {"class": "movieCover"}),
+        ("div", {"class": "data"}),
+        ("a", {"class": "kaGiantButton"}),
+    )
     def __init__(self):
         self.BASE_URL = KICKASS
         self.LIMIT = None
@@ -18,44 +24,31 @@ class Kickass:
     @decorator_asyncio_fix
     async def _individual_scrap(self, session, url, obj):
         try:
-            async with session.get(url, headers=HEADER_AIO) as res:
-                html = await res.text(encoding="ISO-8859-1")
-                soup = BeautifulSoup(html, "html.parser")
-                try:
-                    poster = soup.find("a", class_="movieCover")
-                    if poster:
-                        poster = poster.find("img")["src"]
-                        obj["poster"] = self.BASE_URL + poster
-                    imgs = (soup.find("div", class_="data")).find_all("img")
-                    if imgs and len(imgs) > 0:
-                        obj["screenshot"] = [img["src"] for img in imgs]
-                    magnet_and_torrent = soup.find_all("a", class_="kaGiantButton")
-                    magnet = magnet_and_torrent[0]["href"]
-                    obj["hash"] = re.search(
-                        r"([{a-f\d,A-F\d}]{32,40})\b", magnet
-                    ).group(0)
-                    obj["magnet"] = magnet
-                except:
-                    ...
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
+            try:
+                poster = soup.find("a", class_="movieCover")
+                if poster:
+                    poster = poster.find("img")["src"]
+                    obj["poster"] = self.BASE_URL + poster
+                imgs = (soup.find("div", class_="data")).find_all("img")
+                if imgs and len(imgs) > 0:
+                    obj["screenshot"] = [img["src"] for img in imgs]
+                magnet_and_torrent = soup.find_all("a", class_="kaGiantButton")
+                magnet = magnet_and_torrent[0]["href"]
+                obj["hash"] = re.search(
+                    r"([{a-f\d,A-F\d}]{32,40})\b", magnet
+                ).group(0)
+                obj["magnet"] = magnet
+            except:
+                ...
         except:
             return None
 
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx])
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
-
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
                 for tr in soup.select("tr.odd,tr.even"):
@@ -99,7 +92,7 @@ class Kickass:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/usearch/{}/{}/".format(query, page)
@@ -107,16 +100,16 @@ class Kickass:
 
     async def parser_result(self, start_time, url, session):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls)
+        result, urls = await parse(self._parser, htmls)
         if result is not None:
-            results = await self._get_torrent(result, session, urls)
+            results = await enrich(session, result, self._individual_scrap)
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
             return results
         return result
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -130,7 +123,7 @@ class Kickass:
             return await self.parser_result(start_time, url, session)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -1,58 +1,45 @@
-import asyncio
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import LIBGEN
-from constants.headers import HEADER_AIO
 
 
 class Libgen:
     _name = "Libgen"
+    _DETAIL_FIELDS = {"torrent", "poster"}
+    _DETAIL_SPEC = Extract("a", "img")
     def __init__(self):
         self.BASE_URL = LIBGEN
         self.LIMIT = None
 
     @decorator_asyncio_fix
-    async def _individual_scrap(self, session, url, obj, sem):
-        async with sem:
+    async def _individual_scrap(self, session, url, obj):
+        try:
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
             try:
-                async with session.get(url, headers=HEADER_AIO) as res:
-                    html = await res.text(encoding="ISO-8859-1")
-                    soup = BeautifulSoup(html, "html.parser")
-                    try:
-                        x = soup.find_all("a")
-                        for a in x:
-                            if a.text == "One-filetorrent":
-                                if a["href"] != "#":
-                                    obj["torrent"] = self.BASE_URL + a["href"]
-                        poster = soup.find_all("img")[0]
+                x = soup.find_all("a")
+                for a in x:
+                    if a.text == "One-filetorrent":
+                        if a["href"] != "#":
+                            obj["torrent"] = self.BASE_URL + a["href"]
+                poster = soup.find_all("img")[0]
 
-                        if poster:
-                            obj["poster"] = "http://library.lol" + poster["src"]
-                    except:
-                        ...
+                if poster:
+                    obj["poster"] = "http://library.lol" + poster["src"]
             except:
-                return None
-
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        sem = asyncio.Semaphore(3)
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx], sem)
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
+                ...
+        except:
+            return None
 
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
                 trs = soup.select("[valign=top]")
@@ -99,7 +86,7 @@ class Libgen:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = (
@@ -112,9 +99,9 @@ class Libgen:
 
     async def parser_result(self, start_time, url, session):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls)
+        result, urls = await parse(self._parser, htmls)
         if result is not None:
-            results = await self._get_torrent(result, session, urls)
+            results = await enrich(session, result, self._individual_scrap)
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
             return results
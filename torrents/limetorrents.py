@@ -1,16 +1,18 @@
-import asyncio
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import LIMETORRENT
-from constants.headers import HEADER_AIO
 
 
 class Limetorrent:
     _name = "Lime Torrents"
+    _DETAIL_FIELDS = {"torrent", "magnet", "hash"}
+    _DETAIL_SPEC = Extract(("a", {"class": "csprite_dltorrent"}))
     def __init__(self):
         self.BASE_URL = LIMETORRENT
         self.LIMIT = None
@@ -18,37 +20,24 @@ class Limetorrent:
     @decorator_asyncio_fix
     async def _individual_scrap(self, session, url, obj):
         try:
-            async with session.get(url, headers=HEADER_AIO) as res:
-                html = await res.text(encoding="ISO-8859-1")
-                soup = BeautifulSoup(html, "html.parser")
-                try:
-                    a_tag = soup.find_all("a", class_="csprite_dltorrent")
-                    obj["torrent"] = a_tag[0]["href"]
-                    obj["magnet"] = a_tag[-1]["href"]
-                    obj["hash"] = re.search(
-                        r"([{a-f\d,A-F\d}]{32,40})\b", obj["magnet"]
-                    ).group(0)
-                except:
-                    ...
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
+            try:
+                a_tag = soup.find_all("a", class_="csprite_dltorrent")
+                obj["torrent"] = a_tag[0]["href"]
+                obj["magnet"] = a_tag[-1]["href"]
+                obj["hash"] = re.search(
+                    r"([{a-f\d,A-F\d}]{32,40})\b", obj["magnet"]
+                ).group(0)
+            except:
+                ...
         except:
             return None
 
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx])
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
-
     def _parser(self, htmls, idx=0):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
 
@@ -93,7 +82,7 @@ class Limetorrent:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/search/all/{}//{}".format(query, page)
@@ -101,23 +90,23 @@ class Limetorrent:
 
     async def parser_result(self, start_time, url, session, idx=0):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls, idx)
+        result, urls = await parse(self._parser, htmls, idx)
         if result is not None:
-            results = await self._get_torrent(result, session, urls)
+            results = await enrich(session, result, self._individual_scrap)
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
             return results
         return result
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/top100"
             return await self.parser_result(start_time, url, session)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -1,10 +1,11 @@
 import asyncio
 import re
 import time
-import aiohttp
-import cloudscraper
 import requests
-from bs4 import BeautifulSoup
+from helper.http_client import client_session
+from helper import cloudflare
+from helper.parser import make_soup
+from helper.parse_pool import parse
 from constants.base_url import MAGNETDL
 
 
@@ -17,7 +18,7 @@ class Magnetdl:
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
 
                 my_dict = {"data": []}
                 table = soup.find("table", class_="download")
@@ -82,17 +83,13 @@ class Magnetdl:
             return None
 
     async def _get_html(self, session, url):
-        session = cloudscraper.create_scraper(sess=session)
-        try:
-            return session.get(url).text
-        except:
-            return None
+        return await cloudflare.get_html(session, url)
 
     async def _get_all_results(self, session, url):
         return await asyncio.gather(asyncio.create_task(self._get_html(session, url)))
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             query = requests.utils.unquote(query)
@@ -103,7 +100,7 @@ class Magnetdl:
 
     async def parser_result(self, start_time, url, session):
         data = await self._get_all_results(session, url)
-        results = self._parser(data)
+        results = await parse(self._parser, data)
         if results is not None:
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
@@ -111,7 +108,7 @@ class Magnetdl:
         return results
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
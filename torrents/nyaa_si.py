@@ -1,13 +1,15 @@
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.html_scraper import Scraper
+from helper.http_client import client_session
+from helper.parser import make_soup
+from helper.parse_pool import parse
 from constants.base_url import NYAASI
 
 
 class NyaaSi:
     _name = "Nyaa"
+    _DATE_FORMATS = ("%Y-%m-%d %H:%M",)
     def __init__(self):
         self.BASE_URL = NYAASI
         self.LIMIT = None
@@ -15,7 +17,7 @@ class NyaaSi:
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
 
                 my_dict = {"data": []}
                 for tr in (soup.find("table")).find_all("tr")[1:]:
@@ -65,7 +67,7 @@ class NyaaSi:
             return None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/?f=0&c=0_0&q={}&p={}".format(query, page)
@@ -73,7 +75,7 @@ class NyaaSi:
 
     async def parser_result(self, start_time, url, session):
         html = await Scraper().get_all_results(session, url)
-        results = self._parser(html)
+        results = await parse(self._parser, html)
         if results is not None:
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
@@ -81,7 +83,7 @@ class NyaaSi:
         return results
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL
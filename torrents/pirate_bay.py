@@ -1,13 +1,16 @@
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.html_scraper import Scraper
+from helper.http_client import client_session
+from helper.parser import make_soup
+from helper.parse_pool import parse
+from helper.streaming import Rows
 from constants.base_url import PIRATEBAY
 
 
 class PirateBay:
     _name = "Pirate Bay"
+    _DATE_FORMATS = ("%m-%d %Y", "%m-%d %H:%M")
     def __init__(self):
         self.BASE_URL = PIRATEBAY
         self.LIMIT = None
@@ -15,7 +18,7 @@ class PirateBay:
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
 
                 my_dict = {"data": []}
                 for tr in soup.find_all("tr")[1:]:
@@ -66,15 +69,19 @@ class PirateBay:
             return None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/search/{}/{}/99/0".format(query, page)
             return await self.parser_result(start_time, url, session)
 
+    def _rows(self):
+        # Only the rows up to LIMIT are parsed, so stop reading after them.
+        return Rows("tr", self.LIMIT + 1)
+
     async def parser_result(self, start_time, url, session):
-        html = await Scraper().get_all_results(session, url)
-        results = self._parser(html)
+        html = await Scraper().get_all_results(session, url, rows=self._rows())
+        results = await parse(self._parser, html)
         if results is not None:
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
@@ -82,14 +89,14 @@ class PirateBay:
         return results
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/top/all"
             return await self.parser_result(start_time, url, session)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -1,16 +1,23 @@
-import asyncio
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import TORLOCK
-from constants.headers import HEADER_AIO
 
 
 class Torlock:
     _name = "Tor Lock"
+    _DATE_FORMATS = ("%m/%d/%Y",)
+    _DETAIL_FIELDS = {"torrent", "magnet", "hash", "category", "poster", "screenshot"}
+    _DETAIL_SPEC = Extract(
+        "a",
+        ("img", {"class": "img-responsive"}),
+        {"class": "tab-content"},
+    )
     def __init__(self):
         self.BASE_URL = TORLOCK
         self.LIMIT = None
@@ -18,54 +25,41 @@ class Torlock:
     @decorator_asyncio_fix
     async def _individual_scrap(self, session, url, obj):
         try:
-            async with session.get(url, headers=HEADER_AIO) as res:
-                html = await res.text(encoding="ISO-8859-1")
-                soup = BeautifulSoup(html, "html.parser")
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
+            try:
+                tm = soup.find_all("a")
+                magnet = tm[20]["href"]
+                torrent = tm[23]["href"]
                 try:
-                    tm = soup.find_all("a")
-                    magnet = tm[20]["href"]
-                    torrent = tm[23]["href"]
-                    try:
-                        obj["poster"] = soup.find_all("img", class_="img-responsive")[
-                            0
-                        ]["src"]
-                    except:
-                        ...
-                    if str(magnet).startswith("magnet") and str(torrent).endswith(
-                        "torrent"
-                    ):
-                        obj["torrent"] = torrent
-                        obj["magnet"] = magnet
-                        obj["hash"] = re.search(
-                            r"([{a-f\d,A-F\d}]{32,40})\b", magnet
-                        ).group(0)
-                        obj["category"] = tm[25].text
-                        imgs = soup.select(".tab-content img.img-fluid")
-                        if imgs and len(imgs) > 0:
-                            obj["screenshot"] = [img["src"] for img in imgs]
-                    else:
-                        del obj
-                except IndexError:
+                    obj["poster"] = soup.find_all("img", class_="img-responsive")[
+                        0
+                    ]["src"]
+                except:
                     ...
+                if str(magnet).startswith("magnet") and str(torrent).endswith(
+                    "torrent"
+                ):
+                    obj["torrent"] = torrent
+                    obj["magnet"] = magnet
+                    obj["hash"] = re.search(
+                        r"([{a-f\d,A-F\d}]{32,40})\b", magnet
+                    ).group(0)
+                    obj["category"] = tm[25].text
+                    imgs = soup.select(".tab-content img.img-fluid")
+                    if imgs and len(imgs) > 0:
+                        obj["screenshot"] = [img["src"] for img in imgs]
+                else:
+                    del obj
+            except IndexError:
+                ...
         except:
             return None
 
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx])
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
-
     def _parser(self, htmls, idx=0):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
 
@@ -112,7 +106,7 @@ class Torlock:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/all/torrents/{}.html?sort=seeds&page={}".format(
@@ -122,16 +116,16 @@ class Torlock:
 
     async def parser_result(self, start_time, url, session, idx=0):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls, idx)
+        result, urls = await parse(self._parser, htmls, idx)
         if result is not None:
-            results = await self._get_torrent(result, session, urls)
+            results = await enrich(session, result, self._individual_scrap)
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
             return results
         return result
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -143,7 +137,7 @@ class Torlock:
             return await self.parser_result(start_time, url, session)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -1,59 +1,43 @@
-import asyncio
 import time
-import aiohttp
 import requests
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import TORRENTPROJECT
-from constants.headers import HEADER_AIO
 
 
 class TorrentProject:
     _name = "Torrent Project"
+    _DETAIL_FIELDS = {"magnet"}
+    _DETAIL_SPEC = Extract({"id": "download"})
     def __init__(self):
         self.BASE_URL = TORRENTPROJECT
         self.LIMIT = None
 
     @decorator_asyncio_fix
-    async def _individual_scrap(self, session, url, obj, sem):
-        async with sem:
+    async def _individual_scrap(self, session, url, obj):
+        try:
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
             try:
-                async with session.get(
-                    url,
-                    headers=HEADER_AIO,
-                ) as res:
-                    html = await res.text(encoding="ISO-8859-1")
-                    soup = BeautifulSoup(html, "html.parser")
-                    try:
-                        magnet = soup.select_one(
-                            "#download > div:nth-child(2) > div > a"
-                        )["href"]
-                        index_of_magnet = magnet.index("magnet")
-                        magnet = requests.utils.unquote(magnet[index_of_magnet:])
-                        obj["magnet"] = magnet
-                    except:
-                        ...
+                magnet = soup.select_one(
+                    "#download > div:nth-child(2) > div > a"
+                )["href"]
+                index_of_magnet = magnet.index("magnet")
+                magnet = requests.utils.unquote(magnet[index_of_magnet:])
+                obj["magnet"] = magnet
             except:
-                return None
-
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        sem = asyncio.Semaphore(3)
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx], sem)
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
+                ...
+        except:
+            return None
 
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
                 for div in soup.select("div#similarfiles div")[2:]:
@@ -83,7 +67,7 @@ class TorrentProject:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/?t={}&p={}".format(query, page - 1)
@@ -91,9 +75,9 @@ class TorrentProject:
 
     async def parser_result(self, start_time, url, session):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls)
+        result, urls = await parse(self._parser, htmls)
         if result is not None:
-            results = await self._get_torrent(result, session, urls)
+            results = await enrich(session, result, self._individual_scrap)
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
             return results
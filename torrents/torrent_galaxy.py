@@ -1,20 +1,27 @@
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.html_scraper import Scraper
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import TGX
 
 
 class TorrentGalaxy:
     _name = "Torrent Galaxy"
+    _DATE_FORMATS = ("%d/%m/%y %H:%M",)
+    _DETAIL_SPEC = Extract(
+        ("div", {"class": "gluewrapper"}),
+        {"id": "imdbpage"},
+        ("div", {"id": "intblockslide"}),
+    )
     def __init__(self):
         self.BASE_URL = TGX
         self.LIMIT = None
 
     def _parser_individual(self, html):
         try:
-            soup = BeautifulSoup(html[0], "html.parser")
+            soup = make_soup(html[0], parse_only=self._DETAIL_SPEC)
             my_dict = {"data": []}
             root_div = soup.find("div", class_="gluewrapper")
             post_nd_torrents = root_div.find_next("div").find_all("div")
@@ -85,7 +92,7 @@ class TorrentGalaxy:
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
 
                 my_dict = {"data": []}
                 for idx, divs in enumerate(soup.find_all("div", class_="tgxtablerow")):
@@ -171,7 +178,7 @@ class TorrentGalaxy:
             return None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = (
@@ -183,7 +190,7 @@ class TorrentGalaxy:
             return await self.parser_result(start_time, url, session)
 
     async def get_torrent_by_url(self, torrent_url):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             return await self.parser_result(
                 start_time, torrent_url, session, is_individual=True
@@ -192,9 +199,9 @@ class TorrentGalaxy:
     async def parser_result(self, start_time, url, session, is_individual=False):
         html = await Scraper().get_all_results(session, url)
         if is_individual:
-            results = self._parser_individual(html)
+            results = await parse(self._parser_individual, html)
         else:
-            results = self._parser(html)
+            results = await parse(self._parser, html)
         if results is not None:
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
@@ -202,14 +209,14 @@ class TorrentGalaxy:
         return results
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL
             return await self.parser_result(start_time, url, session)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -1,15 +1,18 @@
-import asyncio
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import TORRENTFUNK
-from constants.headers import HEADER_AIO
 
 
 class TorrentFunk:
     _name = "Torrent Funk"
+    _DATE_FORMATS = ("%b %d %Y",)
+    _DETAIL_FIELDS = {"torrent", "category", "hash"}
+    _DETAIL_SPEC = Extract({"id": "right"})
     def __init__(self):
         self.BASE_URL = TORRENTFUNK
         self.LIMIT = None
@@ -17,40 +20,27 @@ class TorrentFunk:
     @decorator_asyncio_fix
     async def _individual_scrap(self, session, url, obj):
         try:
-            async with session.get(url, headers=HEADER_AIO) as res:
-                html = await res.text(encoding="ISO-8859-1")
-                soup = BeautifulSoup(html, "html.parser")
-                try:
-                    obj["torrent"] = soup.select_one(
-                        "#right > main > div.content > table:nth-child(3) > tr > td:nth-child(2) > a"
-                    )["href"]
-                    obj["category"] = soup.select_one(
-                        "#right > main > div.content > table:nth-child(7) > tr> td:nth-child(2) > a"
-                    ).text
-                    obj["hash"] = soup.select_one(
-                        "#right > main > div.content > table:nth-child(7) > tr:nth-child(3) > td:nth-child(2)"
-                    ).text
-                except:
-                    ...
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
+            try:
+                obj["torrent"] = soup.select_one(
+                    "#right > main > div.content > table:nth-child(3) > tr > td:nth-child(2) > a"
+                )["href"]
+                obj["category"] = soup.select_one(
+                    "#right > main > div.content > table:nth-child(7) > tr> td:nth-child(2) > a"
+                ).text
+                obj["hash"] = soup.select_one(
+                    "#right > main > div.content > table:nth-child(7) > tr:nth-child(3) > td:nth-child(2)"
+                ).text
+            except:
+                ...
         except:
             return None
 
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx])
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
-
     def _parser(self, htmls, idx=1):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
 
@@ -84,7 +74,7 @@ class TorrentFunk:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/all/torrents/{}/{}.html".format(query, page)
@@ -92,23 +82,23 @@ class TorrentFunk:
 
     async def parser_result(self, start_time, url, session, idx=1):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls, idx)
+        result, urls = await parse(self._parser, htmls, idx)
         if result:
-            results = await self._get_torrent(result, session, urls)
+            results = await enrich(session, result, self._individual_scrap)
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
             return results
         return result
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL
             return await self.parser_result(start_time, url, session)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
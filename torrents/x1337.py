@@ -1,16 +1,26 @@
-import asyncio
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.pagination import fill_limit
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import X1337
-from constants.headers import HEADER_AIO
 
 
 class x1337:
     _name = "1337x"
+    _DATE_FORMATS = ("%I:%M%p %b %d '%y", "%b %d '%y", "%I:%M%p")
+    _DETAIL_FIELDS = {"magnet", "hash", "poster", "screenshot", "category", "files"}
+    _DETAIL_SPEC = Extract(
+        ("div", {"class": "no-top-radius"}),
+        ("ul", {"class": "list"}),
+        ("div", {"id": "description"}),
+        ("div", {"id": "files"}),
+        ("div", {"class": "torrent-image"}),
+    )
     def __init__(self):
         self.BASE_URL = X1337
         self.LIMIT = None
@@ -18,61 +28,48 @@ class x1337:
     @decorator_asyncio_fix
     async def _individual_scrap(self, session, url, obj):
         try:
-            async with session.get(url, headers=HEADER_AIO) as res:
-                html = await res.text(encoding="ISO-8859-1")
-                soup = BeautifulSoup(html, "html.parser")
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
+            try:
+                magnet = soup.select_one(".no-top-radius > div > ul > li > a")[
+                    "href"
+                ]
+                uls = soup.find_all("ul", class_="list")[1]
+                lis = uls.find_all("li")[0]
+                imgs = [
+                    img["data-original"]
+                    for img in (soup.find("div", id="description")).find_all("img")
+                    if img["data-original"].endswith((".png", ".jpg", ".jpeg"))
+                ]
+                files = [
+                    f.text for f in soup.find("div", id="files").find_all("li")
+                ]
+                if len(imgs) > 0:
+                    obj["screenshot"] = imgs
+                obj["category"] = lis.find("span").text
+                obj["files"] = files
                 try:
-                    magnet = soup.select_one(".no-top-radius > div > ul > li > a")[
-                        "href"
-                    ]
-                    uls = soup.find_all("ul", class_="list")[1]
-                    lis = uls.find_all("li")[0]
-                    imgs = [
-                        img["data-original"]
-                        for img in (soup.find("div", id="description")).find_all("img")
-                        if img["data-original"].endswith((".png", ".jpg", ".jpeg"))
-                    ]
-                    files = [
-                        f.text for f in soup.find("div", id="files").find_all("li")
-                    ]
-                    if len(imgs) > 0:
-                        obj["screenshot"] = imgs
-                    obj["category"] = lis.find("span").text
-                    obj["files"] = files
-                    try:
-                        poster = soup.select_one("div.torrent-image img")["src"]
-                        if str(poster).startswith("//"):
-                            obj["poster"] = "https:" + poster
-                        elif str(poster).startswith("/"):
-                            obj["poster"] = self.BASE_URL + poster
-                    except:
-                        ...
-                    obj["magnet"] = magnet
-
-                    obj["hash"] = re.search(
-                        r"([{a-f\d,A-F\d}]{32,40})\b", magnet
-                    ).group(0)
-                except IndexError:
+                    poster = soup.select_one("div.torrent-image img")["src"]
+                    if str(poster).startswith("//"):
+                        obj["poster"] = "https:" + poster
+                    elif str(poster).startswith("/"):
+                        obj["poster"] = self.BASE_URL + poster
+                except:
                     ...
+                obj["magnet"] = magnet
+
+                obj["hash"] = re.search(
+                    r"([{a-f\d,A-F\d}]{32,40})\b", magnet
+                ).group(0)
+            except IndexError:
+                ...
         except:
             return None
 
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx])
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
-
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
                 trs = soup.select("tbody tr")
@@ -116,52 +113,42 @@ class x1337:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             self.LIMIT = limit
             start_time = time.time()
-            url = self.BASE_URL + "/search/{}/{}/".format(query, page)
+
+            def page_url(page):
+                return self.BASE_URL + "/search/{}/{}/".format(query, page)
+
             return await self.parser_result(
-                start_time, url, session, query=query, page=page
+                start_time, page_url(page), session, page, page_url
             )
 
-    async def parser_result(self, start_time, url, session, page, query=None):
+    async def _load_page(self, session, url, limit):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls)
-        if result is not None:
-            results = await self._get_torrent(result, session, urls)
-            results["time"] = time.time() - start_time
-            results["total"] = len(results["data"])
-            if query is None:
-                return results
-            while True:
-                if len(results["data"]) >= self.LIMIT:
-                    results["data"] = results["data"][0 : self.LIMIT]
-                    results["total"] = len(results["data"])
-                    return results
-                page = page + 1
-                url = self.BASE_URL + "/search/{}/{}/".format(query, page)
-                htmls = await Scraper().get_all_results(session, url)
-                result, urls = self._parser(htmls)
-                if result is not None:
-                    if len(result["data"]) > 0:
-                        res = await self._get_torrent(result, session, urls)
-                        for obj in res["data"]:
-                            results["data"].append(obj)
-                        try:
-                            results["current_page"] = res["current_page"]
-                        except:
-                            ...
-                        results["time"] = time.time() - start_time
-                        results["total"] = len(results["data"])
-                    else:
-                        break
-                else:
-                    break
+        result, urls = await parse(self._parser, htmls)
+        if result is None:
+            return None
+        return await enrich(session, result, self._individual_scrap, limit=limit)
+
+    async def parser_result(self, start_time, url, session, page, page_url=None):
+        results = await self._load_page(session, url, self.LIMIT)
+        if results is None:
             return results
-        return result
+        if page_url is not None:
+            results = await fill_limit(
+                results,
+                page,
+                self.LIMIT,
+                lambda page, wanted: self._load_page(session, page_url(page), wanted),
+            )
+        results["data"] = results["data"][0 : self.LIMIT]
+        results["time"] = time.time() - start_time
+        results["total"] = len(results["data"])
+        return results
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -171,7 +158,7 @@ class x1337:
             return await self.parser_result(start_time, url, session, page)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if not category:
@@ -183,10 +170,15 @@ class x1337:
             return await self.parser_result(start_time, url, session, page)
 
     async def search_by_category(self, query, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
-            url = self.BASE_URL + "/category-search/{}/{}/{}/".format(
-                query, category.capitalize(), page
+
+            def page_url(page):
+                return self.BASE_URL + "/category-search/{}/{}/{}/".format(
+                    query, category.capitalize(), page
+                )
+
+            return await self.parser_result(
+                start_time, page_url(page), session, page, page_url
             )
-            return await self.parser_result(start_time, url, session, page, query)
@@ -1,15 +1,21 @@
-import asyncio
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import YOURBITTORRENT
-from constants.headers import HEADER_AIO
 
 
 class YourBittorrent:
     _name = "Your BitTorrent"
+    _DATE_FORMATS = ("%y-%m-%d",)
+    _DETAIL_FIELDS = {"torrent", "poster"}
+    _DETAIL_SPEC = Extract(
+        ("div", {"class": "card-body"}),
+        ("div", {"class": "clearfix"}),
+    )
     def __init__(self):
         self.BASE_URL = YOURBITTORRENT
         self.LIMIT = None
@@ -17,42 +23,29 @@ class YourBittorrent:
     @decorator_asyncio_fix
     async def _individual_scrap(self, session, url, obj):
         try:
-            async with session.get(url, headers=HEADER_AIO) as res:
-                html = await res.text(encoding="ISO-8859-1")
-                soup = BeautifulSoup(html, "html.parser")
-                try:
-                    container = soup.select_one("div.card-body.container")
-                    poster = (
-                        container.find("div")
-                        .find_all("div")[0]
-                        .find("picture")
-                        .find("img")["src"]
-                    )
-                    clearfix = soup.find("div", class_="clearfix")
-                    torrent = clearfix.find("div").find_all("div")[1].find("a")["href"]
-                    obj["torrent"] = torrent
-                    obj["poster"] = poster
-                except:
-                    ...
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
+            try:
+                container = soup.select_one("div.card-body.container")
+                poster = (
+                    container.find("div")
+                    .find_all("div")[0]
+                    .find("picture")
+                    .find("img")["src"]
+                )
+                clearfix = soup.find("div", class_="clearfix")
+                torrent = clearfix.find("div").find_all("div")[1].find("a")["href"]
+                obj["torrent"] = torrent
+                obj["poster"] = poster
+            except:
+                ...
         except:
             return None
 
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx])
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
-
     def _parser(self, htmls, idx=1):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
 
@@ -82,7 +75,7 @@ class YourBittorrent:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/?v=&c=&q={}".format(query)
@@ -90,16 +83,16 @@ class YourBittorrent:
 
     async def parser_result(self, start_time, url, session, idx=1):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls, idx)
+        result, urls = await parse(self._parser, htmls, idx)
         if result is not None:
-            results = await self._get_torrent(result, session, urls)
+            results = await enrich(session, result, self._individual_scrap)
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
             return results
         return result
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             idx = None
@@ -114,7 +107,7 @@ class YourBittorrent:
             return await self.parser_result(start_time, url, session, idx)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             idx = None
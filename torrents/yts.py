@@ -1,16 +1,37 @@
-import asyncio
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.asyncioPoliciesFix import decorator_asyncio_fix
 from helper.html_scraper import Scraper
+from helper.enrichment import enrich
+from helper.http_client import client_session
+from helper.parser import Extract, make_soup
+from helper.parse_pool import parse
 from constants.base_url import YTS
-from constants.headers import HEADER_AIO
 
 
 class Yts:
     _name = "YTS"
+    _DATE_FORMATS = ("%Y",)
+    _DETAIL_FIELDS = {
+        "name",
+        "date",
+        "genre",
+        "rating",
+        "poster",
+        "description",
+        "runtime",
+        "screenshot",
+        "torrents",
+    }
+    _DETAIL_SPEC = Extract(
+        ("div", {"class": "hidden-xs"}),
+        {"itemprop": "ratingValue"},
+        ("div", {"id": "movie-poster"}),
+        ("div", {"id": "synopsis"}),
+        {"class": "tech-spec-info"},
+        ("a", {"class": "screenshot-group"}),
+        ("div", {"class": "modal-torrent"}),
+    )
     def __init__(self):
         self.BASE_URL = YTS
         self.LIMIT = None
@@ -18,83 +39,70 @@ class Yts:
     @decorator_asyncio_fix
     async def _individual_scrap(self, session, url, obj):
         try:
-            async with session.get(url, headers=HEADER_AIO) as res:
-                html = await res.text(encoding="ISO-8859-1")
-                soup = BeautifulSoup(html, "html.parser")
-                try:
-                    name = soup.select_one("div.hidden-xs h1").text
-                    div = soup.select("div.hidden-xs h2")
-                    date = div[0].text
-                    genre = div[1].text.split("/")
-                    rating = soup.select_one("[itemprop=ratingValue]").text
-                    poster = (
-                        soup.find("div", id="movie-poster")
-                        .find("img")["src"]
-                        .split("/")
+            html = await Scraper()._get_html(session, url)
+            soup = make_soup(html, parse_only=self._DETAIL_SPEC)
+            try:
+                name = soup.select_one("div.hidden-xs h1").text
+                div = soup.select("div.hidden-xs h2")
+                date = div[0].text
+                genre = div[1].text.split("/")
+                rating = soup.select_one("[itemprop=ratingValue]").text
+                poster = (
+                    soup.find("div", id="movie-poster")
+                    .find("img")["src"]
+                    .split("/")
+                )
+                poster[-1] = poster[-1].replace("medium", "large")
+                poster = "/".join(poster)
+                description = soup.select("div#synopsis > p")[0].text.strip()
+                runtime = (
+                    soup.select_one(".tech-spec-info")
+                    .find_all("div", class_="row")[-1]
+                    .find_all("div")[-3]
+                    .text.strip()
+                )
+
+                screenshots = soup.find_all("a", class_="screenshot-group")
+                screenshots = [a["href"] for a in screenshots]
+                torrents = []
+                for div in soup.find_all("div", class_="modal-torrent"):
+                    quality = (
+                        div.find("div", class_="modal-quality").find("span").text
                     )
-                    poster[-1] = poster[-1].replace("medium", "large")
-                    poster = "/".join(poster)
-                    description = soup.select("div#synopsis > p")[0].text.strip()
-                    runtime = (
-                        soup.select_one(".tech-spec-info")
-                        .find_all("div", class_="row")[-1]
-                        .find_all("div")[-3]
-                        .text.strip()
+                    all_p = div.find_all("p", class_="quality-size")
+                    quality_type = all_p[0].text
+                    size = all_p[1].text
+                    torrent_link = div.find("a", class_="download-torrent")["href"]
+                    magnet = div.find("a", class_="magnet-download")["href"]
+                    hash = re.search(r"([{a-f\d,A-F\d}]{32,40})\b", magnet).group(0)
+                    torrents.append(
+                        {
+                            "quality": quality,
+                            "type": quality_type,
+                            "size": size,
+                            "torrent": torrent_link,
+                            "magnet": magnet,
+                            "hash": hash,
+                        }
                     )
-
-                    screenshots = soup.find_all("a", class_="screenshot-group")
-                    screenshots = [a["href"] for a in screenshots]
-                    torrents = []
-                    for div in soup.find_all("div", class_="modal-torrent"):
-                        quality = (
-                            div.find("div", class_="modal-quality").find("span").text
-                        )
-                        all_p = div.find_all("p", class_="quality-size")
-                        quality_type = all_p[0].text
-                        size = all_p[1].text
-                        torrent_link = div.find("a", class_="download-torrent")["href"]
-                        magnet = div.find("a", class_="magnet-download")["href"]
-                        hash = re.search(r"([{a-f\d,A-F\d}]{32,40})\b", magnet).group(0)
-                        torrents.append(
-                            {
-                                "quality": quality,
-                                "type": quality_type,
-                                "size": size,
-                                "torrent": torrent_link,
-                                "magnet": magnet,
-                                "hash": hash,
-                            }
-                        )
-                    obj["name"] = name
-                    obj["date"] = date
-                    obj["genre"] = genre
-                    obj["rating"] = rating
-                    obj["poster"] = poster
-                    obj["description"] = description
-                    obj["runtime"] = runtime
-                    obj["screenshot"] = screenshots
-                    obj["torrents"] = torrents
-                except:
-                    ...
+                obj["name"] = name
+                obj["date"] = date
+                obj["genre"] = genre
+                obj["rating"] = rating
+                obj["poster"] = poster
+                obj["description"] = description
+                obj["runtime"] = runtime
+                obj["screenshot"] = screenshots
+                obj["torrents"] = torrents
+            except:
+                ...
         except:
             return None
 
-    async def _get_torrent(self, result, session, urls):
-        tasks = []
-        for idx, url in enumerate(urls):
-            for obj in result["data"]:
-                if obj["url"] == url:
-                    task = asyncio.create_task(
-                        self._individual_scrap(session, url, result["data"][idx])
-                    )
-                    tasks.append(task)
-        await asyncio.gather(*tasks)
-        return result
-
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 list_of_urls = []
                 my_dict = {"data": []}
                 for div in soup.find_all("div", class_="browse-movie-wrap"):
@@ -127,7 +135,7 @@ class Yts:
             return None, None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if page != 1:
@@ -145,23 +153,23 @@ class Yts:
 
     async def parser_result(self, start_time, url, session):
         htmls = await Scraper().get_all_results(session, url)
-        result, urls = self._parser(htmls)
+        result, urls = await parse(self._parser, htmls)
         if result is not None:
-            results = await self._get_torrent(result, session, urls)
+            results = await enrich(session, result, self._individual_scrap)
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])
             return results
         return result
 
     async def trending(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/trending-movies"
             return await self.parser_result(start_time, url, session)
 
     async def recent(self, category, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             if page != 1:
@@ -1,13 +1,16 @@
 import re
 import time
-import aiohttp
-from bs4 import BeautifulSoup
 from helper.html_scraper import Scraper
+from helper.http_client import client_session
+from helper.parser import make_soup
+from helper.parse_pool import parse
+from helper.streaming import Rows
 from constants.base_url import ZOOQLE
 
 
 class Zooqle:
     _name = "Zooqle"
+    _DATE_FORMATS = ("%b %d, %Y",)
     def __init__(self):
         self.BASE_URL = ZOOQLE
         self.LIMIT = None
@@ -15,7 +18,7 @@ class Zooqle:
     def _parser(self, htmls):
         try:
             for html in htmls:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
 
                 my_dict = {"data": []}
 
@@ -63,15 +66,19 @@ class Zooqle:
             return None
 
     async def search(self, query, page, limit):
-        async with aiohttp.ClientSession() as session:
+        async with client_session() as session:
             start_time = time.time()
             self.LIMIT = limit
             url = self.BASE_URL + "/search?pg={1}&q={0}&v=t".format(query, page)
             return await self.parser_result(start_time, url, session)
 
+    def _rows(self):
+        # Only the rows up to LIMIT are parsed, so stop reading after them.
+        return Rows("tr", self.LIMIT + 1)
+
     async def parser_result(self, start_time, url, session):
-        html = await Scraper().get_all_results(session, url)
-        results = self._parser(html)
+        html = await Scraper().get_all_results(session, url, rows=self._rows())
+        results = await parse(self._parser, html)
         if results is not None:
             results["time"] = time.time() - start_time
             results["total"] = len(results["data"])